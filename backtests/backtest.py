@@ -1,5 +1,39 @@
+import numpy as np
 import pandas as pd
 
+from src.profiler import profiler
+
+
+def simulate_long_flat(signal, close, initial_capital, units=0.0, last_signal=-1):
+    """
+    Long/flat state machine of `Backtester.run` on 1-D arrays.
+    Returns the accepted trades as (event_idx, event_sig, event_units, event_cash).
+    `units` and `last_signal` carry the state over from a previous chunk (cash is `initial_capital`).
+    """
+    # 1. State transitions: a non-zero signal only matters when it differs from the last one.
+    # Seeding the previous signal with -1 means we start flat, so the first event is always a BUY.
+    event_idx = np.flatnonzero(signal)
+    event_sig = signal[event_idx]
+    prev_sig = np.concatenate(([last_signal], event_sig[:-1]))
+    keep = event_sig != prev_sig
+    event_idx = event_idx[keep]
+    event_sig = event_sig[keep]
+
+    # 2. Cash/units per event. The loop runs once per trade (not per bar) and repeats
+    # the exact float operations of `run` so both engines agree to the last bit.
+    event_units = np.zeros(len(event_idx))
+    event_cash = np.zeros(len(event_idx))
+    balance, units = float(initial_capital), float(units)
+    for k, (i, sig) in enumerate(zip(event_idx, event_sig)):
+        if sig == 1:
+            units, balance = balance / close[i], 0.0
+        else:
+            balance, units = units * close[i], 0.0
+        event_units[k], event_cash[k] = units, balance
+
+    return event_idx, event_sig, event_units, event_cash
+
+
 class Backtester:
     def __init__(self, initial_capital=10000):
         self.initial_capital = initial_capital
@@ -7,8 +41,18 @@ class Backtester:
         self.position = 0  # Number of units held
         self.trades = 0
 
-    def run(self, df):
-        """Simulates trading based on the 'Signal' column"""
+    @profiler.timed("backtest")
+    def run(self, df, engine="loop"):
+        """
+        Simulates trading based on the 'Signal' column.
+        engine="loop" is the original row-by-row reference; engine="vectorized" uses run_vectorized.
+        """
+        if engine == "vectorized":
+            final_balance, total_return, trades, _, _ = self.run_vectorized(df)
+            return final_balance, total_return, trades
+        if engine != "loop":
+            raise ValueError(f"Unknown backtest engine: {engine}")
+
         df = df.dropna().copy()
         
         for index, row in df.iterrows():
@@ -46,5 +90,102 @@ class Backtester:
         total_return = ((self.balance - self.initial_capital) / self.initial_capital) * 100
         return self.balance, total_return, self.trades
 
+    def run_vectorized(self, df):
+        """
+        Array version of the long/flat state machine in `run`.
+        Returns (final_balance, total_return, trades, equity_curve, trade_log).
+        """
+        df = df.dropna()
+        signal = np.asarray(df['Signal'], dtype=np.int8).reshape(-1)
+        close = np.asarray(df['Close'], dtype=np.float64).reshape(-1)
+        n = len(close)
+
+        event_idx, event_sig, event_units, event_cash = simulate_long_flat(signal, close, self.initial_capital)
+        units = event_units[-1] if len(event_units) else 0.0
+        balance = event_cash[-1] if len(event_cash) else float(self.initial_capital)
+
+        # 3. Mark-to-market equity curve: forward-fill the last event state onto every bar.
+        # Slot 0 is the starting state (flat, all cash) for bars before the first trade.
+        state_units = np.concatenate(([0.0], event_units))
+        state_cash = np.concatenate(([float(self.initial_capital)], event_cash))
+        last_event = np.zeros(n, dtype=np.int64)
+        last_event[event_idx] = np.arange(1, len(event_idx) + 1)
+        last_event = np.maximum.accumulate(last_event)
+        held_units = state_units[last_event]
+        cash = state_cash[last_event]
+        equity = np.where(held_units > 0, held_units * close, cash)
+        equity_curve = pd.Series(equity, index=df.index, name='Equity')
+
+        trade_log = pd.DataFrame({
+            'Side': np.where(event_sig == 1, 'BUY', 'SELL'),
+            'Price': close[event_idx],
+            'Units': event_units,
+            'Cash': event_cash,
+        }, index=df.index[event_idx])
+
+        # Final evaluation: If we are still holding, sell at the last price
+        if units > 0:
+            balance = units * close[-1]
+
+        self.balance = balance
+        self.position = 0
+        self.trades = len(event_idx)
+        total_return = ((balance - self.initial_capital) / self.initial_capital) * 100
+        return balance, total_return, self.trades, equity_curve, trade_log
+
+    def run_stream(self, chunks, keep_equity=True):
+        """
+        `run_vectorized` over an iterator of (index, close, signal) chunks (e.g. src.intraday.signal_chunks),
+        carrying cash/units/last signal across chunk edges so only one chunk is in memory at a time.
+        Returns (final_balance, total_return, trades, equity_curve, trade_log); the equity curve is
+        float32 (None with keep_equity=False) and the trade log only holds the sparse trade rows.
+        """
+        cash, units, last_signal = float(self.initial_capital), 0.0, -1
+        last_close, trades = None, 0
+        index_parts, equity_parts, logs = [], [], []
+
+        for index, close, signal in chunks:
+            close = np.asarray(close, dtype=np.float64).reshape(-1)
+            signal = np.asarray(signal, dtype=np.int8).reshape(-1)
+            if not len(close):
+                continue
+            event_idx, event_sig, event_units, event_cash = simulate_long_flat(signal, close, cash, units, last_signal)
+
+            if keep_equity:
+                # Same forward-fill as run_vectorized, with slot 0 holding the state carried in
+                state_units = np.concatenate(([units], event_units))
+                state_cash = np.concatenate(([cash], event_cash))
+                last_event = np.zeros(len(close), dtype=np.int64)
+                last_event[event_idx] = np.arange(1, len(event_idx) + 1)
+                last_event = np.maximum.accumulate(last_event)
+                held_units = state_units[last_event]
+                equity = np.where(held_units > 0, held_units * close, state_cash[last_event])
+                equity_parts.append(equity.astype(np.float32))
+                index_parts.append(index)
+
+            if len(event_idx):
+                logs.append(pd.DataFrame({
+                    'Side': np.where(event_sig == 1, 'BUY', 'SELL'),
+                    'Price': close[event_idx],
+                    'Units': event_units,
+                    'Cash': event_cash,
+                }, index=index[event_idx]))
+                units, cash, last_signal = event_units[-1], event_cash[-1], int(event_sig[-1])
+            trades += len(event_idx)
+            last_close = close[-1]
+
+        balance = units * last_close if units > 0 else cash
+        equity_curve = None
+        if keep_equity:
+            equity_curve = pd.Series(np.concatenate(equity_parts) if equity_parts else np.empty(0, dtype=np.float32),
+                                     index=index_parts[0].append(index_parts[1:]) if index_parts else None, name='Equity')
+        trade_log = pd.concat(logs) if logs else pd.DataFrame(columns=['Side', 'Price', 'Units', 'Cash'])
+
+        self.balance = balance
+        self.position = 0
+        self.trades = trades
+        total_return = ((balance - self.initial_capital) / self.initial_capital) * 100
+        return balance, total_return, trades, equity_curve, trade_log
+
 if __name__ == "__main__":
     print("Backtester module ready.")
\ No newline at end of file
@@ -0,0 +1,176 @@
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from ta.momentum import RSIIndicator
+from ta.trend import SMAIndicator, MACD
+from ta.volatility import BollingerBands
+
+from backtests.backtest import simulate_long_flat
+from src.strategy import TradingStrategy
+
+PARAM_NAMES = ("rsi_period", "sma_fast", "sma_slow", "bb_period", "bb_std")
+
+# --- Per-process state: a zero-copy view of the shared Close array + memoized indicators ---
+_close = None
+_shm = None
+
+
+def _set_close(close):
+    global _close
+    _close = close
+    for cached in (_rsi, _sma, _bb, _macd):
+        cached.cache_clear()
+
+
+def _attach_worker(shm_name, length):
+    """Pool initializer: maps the parent's shared-memory prices without copying them."""
+    global _shm
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    _set_close(np.ndarray((length,), dtype=np.float64, buffer=_shm.buf))
+
+
+def _first_valid(values):
+    valid = np.flatnonzero(~np.isnan(values))
+    return valid[0] if len(valid) else len(values)
+
+
+# Each indicator is computed once per distinct parameter value and reused by every combination
+@lru_cache(maxsize=None)
+def _rsi(period):
+    rsi = RSIIndicator(close=pd.Series(_close), window=period).rsi().to_numpy()
+    return rsi, _first_valid(rsi)
+
+
+@lru_cache(maxsize=None)
+def _sma(window):
+    sma = SMAIndicator(close=pd.Series(_close), window=window).sma_indicator().to_numpy()
+    return sma, _first_valid(sma)
+
+
+@lru_cache(maxsize=None)
+def _bb(period, std):
+    bb = BollingerBands(close=pd.Series(_close), window=period, window_dev=std)
+    high, low = bb.bollinger_hband().to_numpy(), bb.bollinger_lband().to_numpy()
+    return high, low, max(_first_valid(high), _first_valid(low))
+
+
+@lru_cache(maxsize=None)
+def _macd():
+    macd = MACD(close=pd.Series(_close))
+    diff = macd.macd_diff().to_numpy()
+    # MACD_Diff is the last of the three MACD columns to become valid
+    return diff, max(_first_valid(macd.macd_signal().to_numpy()), _first_valid(diff))
+
+
+def _evaluate_chunk(param_sets, initial_capital):
+    """Runs indicators -> signals -> backtest for a batch of parameter dicts."""
+    rows = []
+    macd_diff, macd_start = _macd()
+    for params in param_sets:
+        rsi, rsi_start = _rsi(params["rsi_period"])
+        _, fast_start = _sma(params["sma_fast"])
+        _, slow_start = _sma(params["sma_slow"])
+        bb_high, bb_low, bb_start = _bb(params["bb_period"], params["bb_std"])
+
+        # Same rows Backtester.run keeps after dropna(): everything past the longest warm-up
+        start = max(rsi_start, fast_start, slow_start, bb_start, macd_start)
+        close = _close[start:]
+        if len(close) == 0:
+            rows.append({**params, "Final Balance": np.nan, "Return (%)": np.nan, "Trades": 0})
+            continue
+
+        signal = TradingStrategy.signal_from_arrays(
+            close, rsi[start:], bb_low[start:], bb_high[start:], macd_diff[start:]
+        )
+        _, _, event_units, event_cash = simulate_long_flat(signal, close, initial_capital)
+        balance = float(initial_capital)
+        if len(event_units):
+            balance = event_units[-1] * close[-1] if event_units[-1] > 0 else event_cash[-1]
+        rows.append({
+            **params,
+            "Final Balance": balance,
+            "Return (%)": ((balance - initial_capital) / initial_capital) * 100,
+            "Trades": len(event_units),
+        })
+    return rows
+
+
+class ParameterOptimizer:
+    """
+    Grid / random search over TradingStrategy parameters.
+    Prices live in shared memory for the process pool; indicators are memoized per worker.
+    """
+
+    def __init__(self, df, initial_capital=10000, max_workers=None):
+        self.close = np.ascontiguousarray(np.asarray(df['Close'].dropna(), dtype=np.float64).reshape(-1))
+        self.initial_capital = initial_capital
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    @staticmethod
+    def _defaults():
+        strategy = TradingStrategy()
+        return {name: getattr(strategy, name) for name in PARAM_NAMES}
+
+    @classmethod
+    def grid(cls, **space):
+        """Every combination of the given value lists, e.g. grid(rsi_period=[7, 14], bb_std=[2, 2.5])."""
+        space = {name: space.get(name, [value]) for name, value in cls._defaults().items()}
+        return [dict(zip(PARAM_NAMES, combo)) for combo in itertools.product(*space.values())]
+
+    @classmethod
+    def random(cls, n, seed=None, **space):
+        """Up to `n` distinct combinations sampled from the given value lists."""
+        space = {name: list(space.get(name, [value])) for name, value in cls._defaults().items()}
+        total = math.prod(len(values) for values in space.values())
+        rng = np.random.default_rng(seed)
+        picked = set()
+        while len(picked) < min(n, total):
+            picked.add(tuple(rng.integers(len(values)) for values in space.values()))
+        return [
+            {name: space[name][i] for name, i in zip(PARAM_NAMES, combo)}
+            for combo in sorted(picked)
+        ]
+
+    def run(self, param_sets, sort_by="Return (%)"):
+        """Evaluates every parameter set and returns a results table ranked by `sort_by`."""
+        if not param_sets:
+            return pd.DataFrame(columns=[*PARAM_NAMES, "Final Balance", "Return (%)", "Trades"])
+
+        # Neighbouring combinations share indicator parameters, so each worker's cache gets reused
+        ordered = sorted(param_sets, key=lambda p: (p["rsi_period"], p["bb_period"], p["bb_std"]))
+
+        if self.max_workers == 1:
+            _set_close(self.close)
+            rows = _evaluate_chunk(ordered, self.initial_capital)
+        else:
+            chunk_size = max(1, math.ceil(len(ordered) / (self.max_workers * 4)))
+            chunks = [ordered[i:i + chunk_size] for i in range(0, len(ordered), chunk_size)]
+
+            shm = shared_memory.SharedMemory(create=True, size=max(self.close.nbytes, 1))
+            try:
+                np.ndarray(self.close.shape, dtype=np.float64, buffer=shm.buf)[:] = self.close
+                with ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=_attach_worker,
+                    initargs=(shm.name, len(self.close)),
+                ) as pool:
+                    results = pool.map(_evaluate_chunk, chunks, itertools.repeat(self.initial_capital))
+                    rows = [row for chunk in results for row in chunk]
+            finally:
+                shm.close()
+                shm.unlink()
+
+        results = pd.DataFrame(rows)
+        results = results.sort_values(sort_by, ascending=False, na_position="last")
+        results.insert(0, "Rank", np.arange(1, len(results) + 1))
+        return results.reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    print("Optimizer module ready.")
@@ -0,0 +1,164 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.profiler import profiler
+from src.scanner import PanelScanner, _right_align
+from src.strategy import TradingStrategy
+
+
+class PortfolioBacktester:
+    """
+    Long/flat backtest of a whole watchlist sharing one cash balance.
+    Works on aligned (time x symbol) Close and Signal panels: one Python step per bar,
+    vectorized across symbols. Entries are sized by risk (inverse volatility), and every
+    fill pays `fee` (fraction of notional) and `slippage` (fraction of price).
+    """
+
+    def __init__(self, initial_capital=10000, fee=0.001, slippage=0.0005, risk_per_trade=0.01,
+                 stop_vol_multiple=2.0, max_weight=0.25, vol_window=20):
+        self.initial_capital = initial_capital
+        self.fee = fee
+        self.slippage = slippage
+        self.risk_per_trade = risk_per_trade  # Equity fraction lost if a position moves stop_vol_multiple sigmas
+        self.stop_vol_multiple = stop_vol_multiple
+        self.max_weight = max_weight  # Cap on one position as a fraction of equity
+        self.vol_window = vol_window
+
+    @profiler.timed("portfolio_backtest")
+    def run(self, close, signal):
+        """
+        close, signal: (time x symbol) frames on the same index/columns (NaN close = no bar).
+        Returns (stats dict, equity_curve Series, trade_log DataFrame).
+        """
+        prices = close.to_numpy(dtype=np.float64)
+        signals = signal.reindex_like(close).fillna(0).to_numpy(dtype=np.int8)
+        has_bar = ~np.isnan(prices)
+        marks = close.ffill().to_numpy(dtype=np.float64)  # Last known price for valuation
+
+        # Daily volatility for sizing, from log returns over each symbol's own bars
+        # (a union calendar would turn every equity Monday into NaN next to 24/7 crypto)
+        vol = self.own_bar_vol(close)
+
+        n_bars, n_assets = prices.shape
+        cash = float(self.initial_capital)
+        units = np.zeros(n_assets)
+        equity = np.empty(n_bars)
+        trades = []
+
+        for t in range(n_bars):
+            bar_ok = has_bar[t]
+            # 1. Exits first so their cash is available to new entries on the same bar
+            exits = bar_ok & (signals[t] == -1) & (units > 0)
+            if exits.any():
+                fill = prices[t, exits] * (1 - self.slippage)
+                proceeds = units[exits] * fill
+                cash += (proceeds * (1 - self.fee)).sum()
+                for j, p, q in zip(np.flatnonzero(exits), fill, units[exits]):
+                    trades.append((close.index[t], close.columns[j], 'SELL', p, q))
+                units[exits] = 0.0
+
+            # 2. Entries sized by risk, scaled down together if cash runs short
+            entries = bar_ok & (signals[t] == 1) & (units == 0) & (vol[t] > 0)
+            if entries.any():
+                equity_now = cash + np.nansum(units * marks[t])
+                target = equity_now * self.risk_per_trade / (self.stop_vol_multiple * vol[t, entries])
+                target = np.minimum(target, equity_now * self.max_weight)
+                total = target.sum() * (1 + self.fee)
+                if total > cash:
+                    target *= cash / total
+                fill = prices[t, entries] * (1 + self.slippage)
+                bought = target / fill
+                cash -= (target * (1 + self.fee)).sum()
+                units[entries] = bought
+                for j, p, q in zip(np.flatnonzero(entries), fill, bought):
+                    trades.append((close.index[t], close.columns[j], 'BUY', p, q))
+
+            equity[t] = cash + np.nansum(units * marks[t])
+
+        equity_curve = pd.Series(equity, index=close.index, name='Equity')
+        trade_log = pd.DataFrame(trades, columns=['Date', 'Symbol', 'Side', 'Price', 'Units'])
+        return self.stats(equity_curve, len(trade_log)), equity_curve, trade_log
+
+    def own_bar_vol(self, close):
+        """Rolling std of log returns per symbol on its own bars, carried forward onto the panel's rows."""
+        aligned, order = _right_align(np.log(close.to_numpy(dtype=np.float64)))
+        # Right-aligned, each column's padding only precedes its bars, so diff/rolling see its own series
+        own = pd.DataFrame(aligned).diff().rolling(self.vol_window, min_periods=2).std().to_numpy()
+        vol = np.full(own.shape, np.nan)
+        np.put_along_axis(vol, order, own, axis=0)
+        return pd.DataFrame(vol).ffill().to_numpy()
+
+    def stats(self, equity_curve, trades, periods_per_year=252):
+        returns = equity_curve.pct_change().dropna()
+        peak = equity_curve.cummax()
+        final = equity_curve.iloc[-1] if len(equity_curve) else self.initial_capital
+        sharpe = returns.mean() / returns.std() * np.sqrt(periods_per_year) if returns.std() > 0 else 0.0
+        return {
+            'Final Balance': final,
+            'Return (%)': (final - self.initial_capital) / self.initial_capital * 100,
+            'Max Drawdown (%)': ((peak - equity_curve) / peak).max() * 100 if len(equity_curve) else 0.0,
+            'Sharpe': sharpe,
+            'Trades': trades,
+        }
+
+    @staticmethod
+    def signals_for(close, params):
+        """Signal panel for one TradingStrategy parameter set."""
+        return PanelScanner(TradingStrategy(**params)).signal_panel(close)
+
+
+def _run_fold(backtester, close, fold, param_sets, metric):
+    """Fits parameters on the in-sample slice, then trades the out-of-sample slice with them."""
+    is_start, is_end, oos_end = fold
+    in_sample = close.iloc[is_start:is_end]
+    best_params, best_score = param_sets[0], -np.inf
+    for params in param_sets:
+        stats, _, _ = backtester.run(in_sample, PortfolioBacktester.signals_for(in_sample, params))
+        if stats[metric] > best_score:
+            best_params, best_score = params, stats[metric]
+
+    # Indicators are warmed up on the in-sample bars; only out-of-sample bars are traded
+    window = close.iloc[is_start:oos_end]
+    signals = PortfolioBacktester.signals_for(window, best_params).iloc[is_end - is_start:]
+    stats, equity, trades = backtester.run(close.iloc[is_end:oos_end], signals)
+    return best_params, best_score, stats, equity, trades
+
+
+def walk_forward(close, param_grid, in_sample=504, out_of_sample=126, backtester=None,
+                 metric='Sharpe', max_workers=None):
+    """
+    Rolling walk-forward: re-fit TradingStrategy parameters on each `in_sample` window and
+    trade the following `out_of_sample` bars. Folds run in parallel processes.
+    param_grid: dict of value lists for TradingStrategy arguments (missing ones keep defaults).
+    Returns (fold summary DataFrame, stitched out-of-sample equity Series, trade log).
+    """
+    backtester = backtester or PortfolioBacktester()
+    names = list(param_grid)
+    param_sets = [dict(zip(names, combo)) for combo in itertools.product(*param_grid.values())] or [{}]
+    folds = [
+        (start, start + in_sample, min(start + in_sample + out_of_sample, len(close)))
+        for start in range(0, len(close) - in_sample, out_of_sample)
+    ]
+    if not folds:
+        raise ValueError(f"Need more than {in_sample} bars for walk-forward, got {len(close)}")
+
+    with ProcessPoolExecutor(max_workers=max_workers or min(len(folds), os.cpu_count() or 1)) as pool:
+        results = list(pool.map(
+            _run_fold, itertools.repeat(backtester), itertools.repeat(close), folds,
+            itertools.repeat(param_sets), itertools.repeat(metric),
+        ))
+
+    summary, curves, logs = [], [], []
+    capital = backtester.initial_capital
+    for (is_start, is_end, oos_end), (params, score, stats, equity, trades) in zip(folds, results):
+        summary.append({'OOS Start': close.index[is_end], 'OOS End': close.index[oos_end - 1],
+                        **params, f'In-Sample {metric}': score, **stats})
+        # Each fold starts from initial_capital; chain them by compounding the fold returns
+        curves.append(equity / backtester.initial_capital * capital)
+        capital = curves[-1].iloc[-1]
+        logs.append(trades)
+    return pd.DataFrame(summary), pd.concat(curves), pd.concat(logs, ignore_index=True)
@@ -0,0 +1,247 @@
+"""
+Offline benchmark harness for the dashboard's hot paths.
+
+    python -m benchmarks.run_benchmarks                       # quick profile, compare with baseline
+    python -m benchmarks.run_benchmarks --profile full        # 1k..10M bars, 1..5000 symbols
+    python -m benchmarks.run_benchmarks --save-baseline       # record current numbers as the baseline
+
+Every stage runs on deterministic synthetic data (benchmarks/synthetic.py), gets one untimed
+warm-up call, is timed with perf_counter (median of --repeat) and memory-profiled with
+tracemalloc (peak MB). Each result also carries its measured noise: the relative spread of the
+timed runs and, for a baseline recorded over several --rounds, of the per-round medians.
+A stage is a regression when it is slower than baseline x max(--threshold, 1 + k x noise)
+and by more than --min-delta; k is --noise-factor.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from backtests.backtest import Backtester
+from backtests.portfolio import PortfolioBacktester
+from benchmarks.synthetic import synthetic_ohlcv, synthetic_panel
+from src.intraday import CompactOHLCV, signal_chunks
+from src.scanner import PanelScanner
+from src.strategy import TradingStrategy
+from src.visualizer import Visualizer
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Single-symbol sizes per frequency (daily stops at 10k: ~40 years of business days)
+PROFILES = {
+    "quick": {
+        "single": {"daily": [1_000, 10_000], "minute": [1_000, 10_000]},
+        "panel": {"daily": [(252, 1), (252, 100), (252, 1_000)]},
+    },
+    "full": {
+        "single": {"daily": [1_000, 10_000], "minute": [1_000, 10_000, 100_000, 1_000_000, 10_000_000]},
+        "panel": {
+            "daily": [(252, 1), (252, 100), (252, 1_000), (252, 5_000)],
+            "minute": [(1_000, 1), (1_000, 100), (1_000, 1_000), (1_000, 5_000)],
+        },
+    },
+}
+
+# Stages that are too slow to be useful past a size (the row-by-row loop, per-bar replay)
+MAX_BARS = {"backtest_loop": 100_000, "generate_signals_per_bar": 100_000, "plot_professional": 1_000_000}
+MAX_CELLS = {"portfolio_backtest": 252 * 1_000}
+
+
+def _with_signals(df):
+    strategy = TradingStrategy()
+    return strategy.generate_signals(strategy.add_indicators(df))
+
+
+# name -> (setup(df) -> args, run(*args)); setup time is excluded from the measurement
+SINGLE_STAGES = {
+    "add_indicators": (lambda df: (TradingStrategy(), df.copy()), lambda s, df: s.add_indicators(df)),
+    "generate_signals": (
+        lambda df: (TradingStrategy(), TradingStrategy().add_indicators(df.copy())),
+        lambda s, df: s.generate_signals(df),
+    ),
+    "generate_signals_per_bar": (lambda df: (TradingStrategy(), df.copy()), lambda s, df: s.generate_signals(df, per_bar=True)),
+    "backtest_loop": (lambda df: (_with_signals(df.copy()),), lambda df: Backtester().run(df)),
+    "backtest_vectorized": (lambda df: (_with_signals(df.copy()),), lambda df: Backtester().run_vectorized(df)),
+    # Intraday mode: indicators, signals and backtest streamed over float32 chunks
+    "backtest_chunked": (
+        lambda df: (CompactOHLCV.from_frame(df),),
+        lambda bars: Backtester().run_stream(signal_chunks(bars), keep_equity=False),
+    ),
+    "plot_professional": (lambda df: (_with_signals(df.copy()),), lambda df: Visualizer.plot_professional(df, "SYN")),
+}
+
+PANEL_STAGES = {
+    "scanner_scan": (lambda panel: (PanelScanner(), panel), lambda s, panel: s.scan(panel)),
+    "scanner_signal_panel": (lambda panel: (PanelScanner(), panel), lambda s, panel: s.signal_panel(panel)),
+    "portfolio_backtest": (
+        lambda panel: (PortfolioBacktester(), panel, PanelScanner().signal_panel(panel)),
+        lambda bt, panel, signals: bt.run(panel, signals),
+    ),
+}
+
+
+def measure(setup, run, data, repeat, memory):
+    """
+    Median wall time of `repeat` runs after one untimed warm-up (first-call caches, imports,
+    allocator growth), its relative noise (median absolute deviation / median) and optionally
+    the tracemalloc peak of one more run.
+    """
+    if repeat > 1:
+        run(*setup(data))
+    times = []
+    for _ in range(repeat):
+        args = setup(data)
+        gc.collect()
+        start = time.perf_counter()
+        run(*args)
+        times.append(time.perf_counter() - start)
+    median = float(np.median(times))
+    noise = float(np.median(np.abs(np.array(times) - median)) / median) if median > 0 else 0.0
+    peak_mb = None
+    if memory:
+        args = setup(data)
+        gc.collect()
+        tracemalloc.start()
+        run(*args)
+        peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return median, noise, peak_mb
+
+
+def run_profile(profile, stages=None, repeat=7, memory=True):
+    results = []
+
+    def record(stage, freq, bars, symbols, setup, run, data):
+        if bars > MAX_BARS.get(stage, float("inf")) or bars * symbols > MAX_CELLS.get(stage, float("inf")):
+            return
+        reps = repeat if bars * symbols <= 1_000_000 else 1
+        seconds, noise, peak_mb = measure(setup, run, data, reps, memory)
+        results.append({"stage": stage, "freq": freq, "bars": bars, "symbols": symbols,
+                        "seconds": seconds, "noise": noise, "peak_mb": peak_mb})
+        mem = f"{peak_mb:9.1f} MB" if peak_mb is not None else ""
+        print(f"{stage:26s} {freq:7s} bars={bars:>10,} symbols={symbols:>5,} {seconds * 1000:11.2f} ms "
+              f"±{noise * 100:4.1f}% {mem}")
+
+    for freq, sizes in PROFILES[profile]["single"].items():
+        for bars in sizes:
+            df = synthetic_ohlcv(bars, freq=freq)
+            for stage, (setup, run) in SINGLE_STAGES.items():
+                if stages is None or stage in stages:
+                    record(stage, freq, bars, 1, setup, run, df)
+            del df
+
+    for freq, sizes in PROFILES[profile]["panel"].items():
+        for bars, symbols in sizes:
+            panel = synthetic_panel(bars, symbols, freq=freq)
+            for stage, (setup, run) in PANEL_STAGES.items():
+                if stages is None or stage in stages:
+                    record(stage, freq, bars, symbols, setup, run, panel)
+            del panel
+    return results
+
+
+def merge_rounds(rounds):
+    """
+    Combines full passes of run_profile: median of the per-round medians, and a noise that also
+    covers drift between rounds ((max - min) / 2 of the round medians, relative). Peak memory
+    comes from the first pass.
+    """
+    merged = []
+    for rows in zip(*rounds):
+        seconds = np.array([row["seconds"] for row in rows])
+        median = float(np.median(seconds))
+        drift = float((seconds.max() - seconds.min()) / 2 / median) if median > 0 else 0.0
+        merged.append({**rows[0], "seconds": median,
+                       "noise": max(drift, *(row["noise"] for row in rows))})
+    return merged
+
+
+def _key(row):
+    return f"{row['stage']}|{row['freq']}|{row['bars']}|{row['symbols']}"
+
+
+def compare(results, baseline, threshold, min_delta, noise_factor=3.0):
+    """
+    Returns rows slower than baseline x max(threshold, 1 + noise_factor x noise), where noise is
+    the baseline's and this run's relative noise added together, ignoring differences under
+    min_delta seconds.
+    """
+    base = {_key(row): row for row in baseline.get("results", [])}
+    regressions = []
+    for row in results:
+        old = base.get(_key(row))
+        if old is None:
+            continue
+        ratio = row["seconds"] / old["seconds"] if old["seconds"] > 0 else float("inf")
+        limit = max(threshold, 1 + noise_factor * (old.get("noise", 0.0) + row.get("noise", 0.0)))
+        if ratio > limit and row["seconds"] - old["seconds"] > min_delta:
+            regressions.append({**row, "baseline_seconds": old["seconds"], "ratio": ratio, "limit": limit})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark indicators, signals, backtests and plotting offline.")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--stages", help="Comma-separated subset of stages to run")
+    parser.add_argument("--repeat", type=int, default=7, help="Timed runs per stage (median is reported)")
+    parser.add_argument("--rounds", type=int, default=None,
+                        help="Full passes to merge (default 3 with --save-baseline, else 1)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=1.3, help="Minimum allowed slowdown ratio vs baseline")
+    parser.add_argument("--noise-factor", type=float, default=3.0,
+                        help="Noisy stages may slow down by up to 1 + this x (baseline + current noise)")
+    parser.add_argument("--min-delta", type=float, default=0.002, help="Ignore slowdowns smaller than this (s)")
+    args = parser.parse_args()
+
+    stages = set(args.stages.split(",")) if args.stages else None
+    rounds = args.rounds or (3 if args.save_baseline else 1)
+    passes = []
+    for i in range(rounds):
+        if rounds > 1:
+            print(f"--- round {i + 1}/{rounds}")
+        # Memory does not vary between rounds; trace it once
+        passes.append(run_profile(args.profile, stages=stages, repeat=args.repeat, memory=not args.no_memory and i == 0))
+    results = merge_rounds(passes) if rounds > 1 else passes[0]
+    report = {
+        "meta": {
+            "profile": args.profile, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": args.repeat, "rounds": rounds,
+            "python": sys.version.split()[0], "numpy": np.__version__, "pandas": pd.__version__,
+            "platform": platform.platform(), "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found; run with --save-baseline to create one.")
+        return 0
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.threshold, args.min_delta, args.noise_factor)
+    for row in regressions:
+        print(f"REGRESSION {_key(row)}: {row['seconds'] * 1000:.2f} ms vs "
+              f"{row['baseline_seconds'] * 1000:.2f} ms ({row['ratio']:.2f}x, allowed {row['limit']:.2f}x)")
+    print(f"{len(regressions)} regression(s) beyond the noise-adjusted threshold (min {args.threshold}x)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+FREQUENCIES = {
+    "daily": "B",  # Business days, like equity data from yfinance
+    "minute": "min",  # Continuous 1-minute bars, like crypto intraday data
+}
+# Per-bar volatility so daily and minute series both look realistic
+BAR_VOL = {"daily": 0.02, "minute": 0.0008}
+
+
+def synthetic_ohlcv(n_bars, freq="daily", seed=0, start="2000-01-03", price=100.0):
+    """
+    Deterministic OHLCV frame shaped like DataLoader.fetch_data output (no network).
+    Close follows a geometric random walk; Open is the previous Close, High/Low wrap both.
+    """
+    rng = np.random.default_rng(seed)
+    vol = BAR_VOL[freq]
+    close = price * np.exp(np.cumsum(rng.normal(0, vol, n_bars)))
+    open_ = np.concatenate(([price], close[:-1]))
+    wick = np.abs(rng.normal(0, vol / 2, (2, n_bars)))
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+    volume = rng.lognormal(12, 1, n_bars).round()
+    index = pd.date_range(start=start, periods=n_bars, freq=FREQUENCIES[freq])
+    return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume}, index=index)
+
+
+def synthetic_panel(n_bars, n_symbols, freq="daily", seed=0, start="2000-01-03"):
+    """Deterministic (time x symbol) Close panel for the multi-symbol stages."""
+    rng = np.random.default_rng(seed)
+    shocks = rng.normal(0, BAR_VOL[freq], (n_bars, n_symbols)).astype(np.float64)
+    prices = 100.0 * np.exp(np.cumsum(shocks, axis=0))
+    index = pd.date_range(start=start, periods=n_bars, freq=FREQUENCIES[freq])
+    return pd.DataFrame(prices, index=index, columns=[f"SYM{i:04d}" for i in range(n_symbols)])
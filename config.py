@@ -0,0 +1,21 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Headless scanner service (python -m src.scanner_service)
+SCANNER_DB = os.getenv("SCANNER_DB", "scanner.db")
+SCANNER_INTERVAL = int(os.getenv("SCANNER_INTERVAL", "60"))  # Seconds between refreshes
+SCANNER_PERIODS = os.getenv("SCANNER_PERIODS", "6mo,1y,2y,5y").split(",")
+SCANNER_WATCHLIST = os.getenv(
+    "SCANNER_WATCHLIST",
+    "BTC-USD,ETH-USD,SOL-USD,^GSPC,^IXIC,AAPL,NVDA,TSLA,MSFT,GOOGL",
+).split(",")
+
+# Optional: serve dashboard stage timings as Prometheus text on http://localhost:<port>/metrics
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# Optional: lets the service send alerts without an open dashboard
+TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
+TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
@@ -1,13 +1,21 @@
+import time
+from contextlib import nullcontext
+
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+import config
 from src.data_loader import DataLoader
 from src.strategy import TradingStrategy
 from src.visualizer import Visualizer 
 from backtests.backtest import Backtester
+from backtests.portfolio import PortfolioBacktester
 from src.sentiment_analyzer import SentimentAnalyzer
-from src.notifier import TelegramNotifier
+from src.notifier import get_dispatcher
+from src.scanner import PanelScanner
+from src.correlation import CorrelationEngine
+from src.risk_manager import RiskManager
+from src.scanner_service import ScanStore
+from src.profiler import profiler
 
 # Page Config
 st.set_page_config(page_title="Institutional Trading Dashboard", layout="wide", page_icon="📈")
@@ -46,6 +54,17 @@ def main():
     tele_token = st.sidebar.text_input("Bot Token", type="password")
     tele_chat_id = st.sidebar.text_input("Chat ID")
 
+    # Results published by the headless scanner service (python -m src.scanner_service)
+    st.sidebar.divider()
+    st.sidebar.subheader("🛰️ Scanner Service")
+    scan_store = ScanStore.open_readonly()
+    last_update = scan_store.last_update(period) if scan_store else None
+    use_service = st.sidebar.checkbox(
+        "Read results from scanner service", value=last_update is not None, disabled=last_update is None
+    )
+    if last_update is not None:
+        st.sidebar.caption(f"Last service update: {time.time() - last_update:.0f}s ago")
+
     if not watchlist:
         st.warning("👈 Please select symbols in the sidebar to begin analysis.")
         return
@@ -57,87 +76,137 @@ def main():
     with tab1:
         st.subheader("Real-Time Signals Dashboard")
         grid_cols = st.columns(3) 
-        progress_bar = st.progress(0)
-        
+        # One card slot per symbol, filled as its download lands and again once the scan is done
+        cards = {}
         for i, symbol in enumerate(watchlist):
-            progress_bar.progress((i + 1) / len(watchlist))
-            loader = DataLoader(symbol)
-            df = loader.fetch_data(period=period)
-            
-            if df.empty: continue
-                
-            df = strategy.add_indicators(df)
-            df = strategy.generate_signals(df)
-            
-            last_row = df.iloc[-1]
-            price = last_row['Close'].item() if hasattr(last_row['Close'], 'item') else last_row['Close']
-            signal = last_row['Signal'].item() if hasattr(last_row['Signal'], 'item') else last_row['Signal']
-            rsi = last_row['RSI'].item() if hasattr(last_row['RSI'], 'item') else last_row['RSI']
+            with grid_cols[i % 3]:
+                cards[symbol] = st.empty()
+
+        scanner = PanelScanner(strategy)
+        service_frames = {}
+        if use_service:
+            # Read-only: the service already fetched and scanned, so this costs no network time
+            scan = scan_store.read_scan(watchlist, period)
+            service_frames = {symbol: scan_store.read_frame(symbol, period) for symbol in scan.index}
+            panel = pd.DataFrame({symbol: df['Close'].squeeze() for symbol, df in service_frames.items() if df is not None})
+        else:
+            # One vectorized pass over the whole watchlist instead of one pipeline per symbol
+            progress_bar = st.progress(0)
+            loaded = []
+
+            def on_loaded(symbol, df):
+                loaded.append(symbol)
+                progress_bar.progress(len(loaded) / len(watchlist), text=f"Loaded {symbol}")
+                with cards[symbol].container():
+                    if df.empty:
+                        st.warning(f"**{symbol}** | No data")
+                    else:
+                        st.info(f"**{symbol}** | ⏳ Scanning...")
+                        st.metric("Price", f"${df['Close'].values.flatten()[-1]:,.2f}")
+                    st.divider()
+
+            panel = scanner.build_panel(watchlist, period=period, on_result=on_loaded)
+            progress_bar.empty()
+            scan = scanner.scan(panel) if not panel.empty else panel
+
+        for i, (symbol, last_row) in enumerate(scan.iterrows()):
+            price = last_row['Price']
+            signal = last_row['Signal']
+            rsi = last_row['RSI']
 
             # Trigger Telegram Alerts
+            # Queued off the render path; the (symbol, bar, signal) key stops repeats on every rerun
             if enable_alerts and tele_token and tele_chat_id:
-                notifier = TelegramNotifier(tele_token, tele_chat_id)
+                dispatcher = get_dispatcher(tele_token)
+                alert_key = (symbol, str(last_row['Date']), int(signal))
                 if signal == 1:
-                    notifier.send_alert(f"🚀 *BUY ALERT*: {symbol}\nPrice: ${price:,.2f}\nRSI: {rsi:.1f}")
+                    dispatcher.submit(tele_chat_id, f"🚀 *BUY ALERT*: {symbol}\nPrice: ${price:,.2f}\nRSI: {rsi:.1f}", key=alert_key)
                 elif signal == -1:
-                    notifier.send_alert(f"🔻 *SELL ALERT*: {symbol}\nPrice: ${price:,.2f}\nRSI: {rsi:.1f}")
+                    dispatcher.submit(tele_chat_id, f"🔻 *SELL ALERT*: {symbol}\nPrice: ${price:,.2f}\nRSI: {rsi:.1f}", key=alert_key)
 
-            with grid_cols[i % 3]:
-                with st.container():
-                    if signal == 1:
-                        st.success(f"**{symbol}** | 🚀 BUY SIGNAL")
-                    elif signal == -1:
-                        st.error(f"**{symbol}** | 🔻 SELL SIGNAL")
-                    else:
-                        st.info(f"**{symbol}** | 😴 NEUTRAL")
-                    st.metric("Price", f"${price:,.2f}", delta=f"RSI: {rsi:.1f}")
+            with cards[symbol].container():
+                if signal == 1:
+                    st.success(f"**{symbol}** | 🚀 BUY SIGNAL")
+                elif signal == -1:
+                    st.error(f"**{symbol}** | 🔻 SELL SIGNAL")
+                else:
+                    st.info(f"**{symbol}** | 😴 NEUTRAL")
+                st.metric("Price", f"${price:,.2f}", delta=f"RSI: {rsi:.1f}")
+                st.divider()
+
+        # Symbols without a scan row (no data, or not published by the service yet)
+        for symbol in watchlist:
+            if symbol not in scan.index:
+                with cards[symbol].container():
+                    st.warning(f"**{symbol}** | No data")
                     st.divider()
-        progress_bar.empty()
+
+        # Whole watchlist as one book: shared cash, risk-based sizing, fees and slippage
+        if use_service:
+            st.caption("Portfolio backtest is not run in scanner-service mode (read-only dashboard).")
+        elif not panel.empty:
+            with st.expander("💼 Portfolio Backtest (shared capital)"):
+                portfolio_bt = PortfolioBacktester(initial_capital=capital, risk_per_trade=risk_pct / 100)
+                stats, equity_curve, _ = portfolio_bt.run(panel, scanner.signal_panel(panel))
+                p1, p2, p3, p4 = st.columns(4)
+                p1.metric("Final Portfolio", f"${stats['Final Balance']:,.2f}")
+                p2.metric("Net ROI", f"{stats['Return (%)']:.2f}%")
+                p3.metric("Max Drawdown", f"{stats['Max Drawdown (%)']:.2f}%")
+                p4.metric("Total Trades", stats['Trades'])
+                st.line_chart(equity_curve)
 
     with tab2:
         st.subheader("Technical & Sentiment Deep Dive")
         selected_stock = st.selectbox("Select Asset to Inspect", watchlist)
         
-        loader = DataLoader(selected_stock)
-        df_detailed = loader.fetch_data(period=period)
-        df_detailed = strategy.add_indicators(df_detailed)
-        df_detailed = strategy.generate_signals(df_detailed)
+        df_detailed = service_frames.get(selected_stock)
+        if df_detailed is None and use_service:
+            st.warning(f"{selected_stock} has not been published by the scanner service yet.")
+        elif df_detailed is None:
+            loader = DataLoader(selected_stock)
+            df_detailed = loader.fetch_data(period=period)
+            df_detailed = strategy.add_indicators(df_detailed)
+            df_detailed = strategy.generate_signals(df_detailed)
 
-        mood_score = SentimentAnalyzer.get_sentiment(selected_stock)
-        
-        c1, c2 = st.columns([1, 3])
-        with c1:
-            st.write("### Market Mood")
-            if mood_score > 0.05:
-                st.write(f"## 😊 Bullish ({mood_score:.2f})")
-            elif mood_score < -0.05:
-                st.write(f"## 😨 Bearish ({mood_score:.2f})")
+        if df_detailed is not None:
+            if use_service:
+                mood_score = scan_store.read_sentiment(selected_stock) or 0.0
             else:
-                st.write(f"## 😐 Neutral ({mood_score:.2f})")
+                mood_score = SentimentAnalyzer.get_sentiment(selected_stock)
+        
+            c1, c2 = st.columns([1, 3])
+            with c1:
+                st.write("### Market Mood")
+                if mood_score > 0.05:
+                    st.write(f"## 😊 Bullish ({mood_score:.2f})")
+                elif mood_score < -0.05:
+                    st.write(f"## 😨 Bearish ({mood_score:.2f})")
+                else:
+                    st.write(f"## 😐 Neutral ({mood_score:.2f})")
         
-        with c2:
-            risk_amount = capital * (risk_pct / 100)
-            pos_size = risk_amount / (stop_loss_pct / 100)
-            st.write("### Risk Strategy")
-            st.info(f"💡 Based on your settings, risk **${risk_amount:,.2f}** to buy **${pos_size:,.2f}** of {selected_stock}.")
+            with c2:
+                risk_amount, pos_size = RiskManager.stop_loss_position(capital, risk_pct, stop_loss_pct)
+                st.write("### Risk Strategy")
+                st.info(f"💡 Based on your settings, risk **${risk_amount:,.2f}** to buy **${pos_size:,.2f}** of {selected_stock}.")
 
-        st.divider()
+            st.divider()
 
-        bt = Backtester(initial_capital=capital)
-        final_val, ret, trades = bt.run(df_detailed)
+            bt = Backtester(initial_capital=capital)
+            final_val, ret, trades = bt.run(df_detailed, engine="vectorized")
 
-        m1, m2, m3, m4 = st.columns(4)
-        m1.metric("Final Portfolio", f"${final_val:,.2f}")
-        m2.metric("Net ROI", f"{ret:.2f}%")
-        m3.metric("Total Trades", trades)
+            m1, m2, m3, m4 = st.columns(4)
+            m1.metric("Final Portfolio", f"${final_val:,.2f}")
+            m2.metric("Net ROI", f"{ret:.2f}%")
+            m3.metric("Total Trades", trades)
         
-        first_p = df_detailed['Close'].iloc[0].item()
-        last_p = df_detailed['Close'].iloc[-1].item()
-        bh_ret = ((last_p - first_p) / first_p) * 100
-        m4.metric("Buy & Hold ROI", f"{bh_ret:.2f}%")
+            first_p = df_detailed['Close'].iloc[0].item()
+            last_p = df_detailed['Close'].iloc[-1].item()
+            bh_ret = ((last_p - first_p) / first_p) * 100
+            m4.metric("Buy & Hold ROI", f"{bh_ret:.2f}%")
 
-        fig = Visualizer.plot_professional(df_detailed, selected_stock)
-        st.plotly_chart(fig, use_container_width=True, theme=None)
+            strategy_params = (strategy.rsi_period, strategy.sma_fast, strategy.sma_slow, strategy.bb_period, strategy.bb_std)
+            fig = Visualizer.plot_professional(df_detailed, selected_stock, cache_key=(selected_stock, period, strategy_params))
+            st.plotly_chart(fig, use_container_width=True, theme=None)
 
     with tab3:
         st.subheader("Asset Correlation Matrix")
@@ -145,32 +214,97 @@ def main():
 
         if len(watchlist) > 1:
             corr_data = {}
-            for symbol in watchlist:
-                loader = DataLoader(symbol)
-                df_corr = loader.fetch_data(period=period)
-                
-                if not df_corr.empty:
+            # Service mode reuses the published frames instead of downloading again
+            sources = service_frames.items() if use_service else DataLoader.fetch_many(watchlist, period=period)
+            for symbol, df_corr in sources:
+                if df_corr is not None and not df_corr.empty:
                     # Fix: Ensure we extract the 'Close' column as a Series
                     # We use .squeeze() to handle potential MultiIndex issues
                     series = df_corr['Close'].squeeze()
                     corr_data[symbol] = series
+            corr_data = {symbol: corr_data[symbol] for symbol in watchlist if symbol in corr_data}
             
             # Create the DataFrame safely
             if corr_data:
                 try:
-                    corr_df = pd.DataFrame(corr_data).corr()
-                    
-                    fig_corr, ax = plt.subplots(figsize=(10, 8))
-                    sns.heatmap(corr_df, annot=True, cmap='RdYlGn', center=0, ax=ax)
-                    ax.set_title("Portfolio Correlation Heatmap")
-                    st.pyplot(fig_corr)
-                    
-                    # Risk Insight logic...
+                    corr_window = st.slider("Rolling Window (bars)", 20, 120, 60)
+                    # Kept across reruns so only new bars are fed into the rolling matrix
+                    engine_key = f"corr_engine_{corr_window}"
+                    if engine_key not in st.session_state:
+                        st.session_state[engine_key] = CorrelationEngine(window=corr_window)
+                    returns, corr_df, rolling_df = st.session_state[engine_key].compute(corr_data)
+
+                    order = CorrelationEngine.cluster_order(corr_df)
+                    c1, c2 = st.columns(2)
+                    with c1:
+                        st.plotly_chart(Visualizer.plot_correlation(corr_df.loc[order, order], "Full-Period Correlation (log returns)"), use_container_width=True, theme=None)
+                    with c2:
+                        if rolling_df is not None:
+                            st.plotly_chart(Visualizer.plot_correlation(rolling_df.loc[order, order], f"Rolling {corr_window}-Bar Correlation"), use_container_width=True, theme=None)
+                        else:
+                            st.info(f"Need at least {corr_window} shared bars for the rolling matrix ({len(returns)} available).")
+
+                    # Risk Insight logic: size and stress the whole watchlist as one book
+                    st.divider()
+                    st.subheader("🛡️ Portfolio Risk")
+                    if use_service:
+                        st.caption("Portfolio risk is not computed in scanner-service mode (read-only dashboard).")
+                    else:
+                        target_vol = st.slider("Target Annual Volatility (%)", 5, 50, 15) / 100
+                        risk = RiskManager(returns).summary(capital, target_vol=target_vol, n_paths=20000, seed=42)
+                        r1, r2, r3, r4 = st.columns(4)
+                        r1.metric("Historical VaR 95% (1 bar)", f"${risk['historical']['VaR']:,.2f}", delta=f"CVaR ${risk['historical']['CVaR']:,.2f}", delta_color="off")
+                        r2.metric("Parametric VaR 95% (1 bar)", f"${risk['parametric']['VaR']:,.2f}", delta=f"CVaR ${risk['parametric']['CVaR']:,.2f}", delta_color="off")
+                        r3.metric("Monte Carlo VaR 95% (20 bars)", f"${risk['monte_carlo']['VaR']:,.2f}", delta=f"CVaR ${risk['monte_carlo']['CVaR']:,.2f}", delta_color="off")
+                        r4.metric("Probability of Loss (20 bars)", f"{risk['monte_carlo']['Prob. of Loss']:.1%}", delta=f"Avg Max DD {risk['monte_carlo']['Avg Max Drawdown']:.1%}", delta_color="off")
+                        st.dataframe(risk['positions'].style.format({'Weight': '{:.1%}', 'Position ($)': '${:,.2f}', 'Annual Vol': '{:.1%}'}), use_container_width=True)
                 except ValueError as e:
                     st.error(f"Correlation Error: Ensure all assets have data for the same period. {e}")
             else:
                 st.error("No data available to calculate correlation.")
         else:
             st.info("Add more assets to your watchlist to see correlations.")
+
+
+def performance_panel(breakdown, captured):
+    """
+    Sidebar timing breakdown of this session's rerun, with rolling p50/p95 (all sessions) and exports.
+    `captured` is the cProfile result of this rerun, or None.
+    """
+    st.sidebar.divider()
+    st.sidebar.subheader("⏱️ Performance")
+    st.sidebar.checkbox("Time pipeline stages", key="profile_stages")
+    if captured is not None:
+        st.session_state["last_profile"] = captured['text']
+        st.session_state["profile_capture"] = False  # One-shot: only the rerun that asked is profiled
+    st.sidebar.checkbox("Profile one rerun (cProfile)", key="profile_capture")
+    if st.session_state.get("last_profile"):
+        with st.sidebar.expander("cProfile (last captured rerun)"):
+            st.code(st.session_state["last_profile"], language=None)
+
+    if not st.session_state["profile_stages"]:
+        return
+    if not breakdown.empty:
+        st.sidebar.caption(f"This rerun: {breakdown.attrs['wall']:.2f}s wall")
+        st.sidebar.dataframe(breakdown.style.format({'Seconds': '{:.3f}'}), use_container_width=True, hide_index=True)
+    with st.sidebar.expander(f"Rolling p50 / p95 (last {len(profiler.history)} reruns)"):
+        st.dataframe(profiler.percentiles().style.format({'p50': '{:.3f}', 'p95': '{:.3f}', 'last': '{:.3f}'}), use_container_width=True)
+        st.download_button("Export Prometheus text", profiler.to_prometheus(), file_name="dashboard_metrics.prom")
+        st.download_button("Export JSON", profiler.to_json(), file_name="dashboard_metrics.json")
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Widgets live at the bottom of the sidebar, so their state is read before main() renders
+    timing = st.session_state.get("profile_stages", False)
+    capture = st.session_state.get("profile_capture", False)
+    if config.METRICS_PORT:
+        profiler.serve(config.METRICS_PORT)
+
+    # The run lives in this session's context, so other sessions' reruns never touch it
+    profiler.begin_run(enabled=timing)
+    try:
+        with profiler.capture() if capture else nullcontext() as captured:
+            main()
+    finally:
+        breakdown = profiler.end_run()
+    performance_panel(breakdown, captured)
\ No newline at end of file
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+from src.profiler import profiler
+
+
+def align_log_returns(closes):
+    """
+    Puts every Close series on a shared calendar and returns log returns.
+    Only timestamps where all symbols traded are kept, so a weekend crypto bar
+    never gets correlated against a stale equity price.
+    """
+    aligned = {}
+    for symbol, series in closes.items():
+        series = series.squeeze().dropna()
+        if series.index.tz is not None:
+            series.index = series.index.tz_convert(None)
+        aligned[symbol] = series[~series.index.duplicated(keep='last')]
+    prices = pd.DataFrame(aligned).dropna(how='any')
+    return np.log(prices).diff().iloc[1:]
+
+
+def _corr_from_moments(n, sums, cross):
+    """Pearson matrix from count, per-asset sums and the cross-product matrix."""
+    mean = sums / n
+    cov = cross / n - np.outer(mean, mean)
+    std = np.sqrt(np.clip(np.diag(cov), 0, None))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = cov / np.outer(std, std)
+    return np.clip(corr, -1.0, 1.0)
+
+
+class RollingCorrelation:
+    """
+    Correlation matrix of the last `window` return rows, updated in O(N^2) per new bar.
+    Running sums are rebuilt exactly every `resync_every` bars to stop rounding drift.
+    """
+
+    def __init__(self, n_assets, window=60, resync_every=None):
+        self.window = window
+        self.resync_every = resync_every or window
+        self._rows = np.zeros((window, n_assets))  # Ring buffer of the window's returns
+        self._count = 0
+        self._since_resync = 0
+        self._sums = np.zeros(n_assets)
+        self._cross = np.zeros((n_assets, n_assets))
+
+    def update(self, row):
+        row = np.asarray(row, dtype=np.float64)
+        slot = self._count % self.window
+        if self._count >= self.window:
+            old = self._rows[slot]
+            self._sums -= old
+            self._cross -= np.outer(old, old)
+        self._rows[slot] = row
+        self._sums += row
+        self._cross += np.outer(row, row)
+        self._count += 1
+
+        self._since_resync += 1
+        if self._since_resync >= self.resync_every and self._count >= self.window:
+            self._sums = self._rows.sum(axis=0)
+            self._cross = self._rows.T @ self._rows
+            self._since_resync = 0
+        return self.matrix()
+
+    def replace_last(self, row):
+        """Overwrites the newest row (e.g. a revised in-progress bar) in O(N^2)."""
+        row = np.asarray(row, dtype=np.float64)
+        slot = (self._count - 1) % self.window
+        old = self._rows[slot]
+        self._sums += row - old
+        self._cross += np.outer(row, row) - np.outer(old, old)
+        self._rows[slot] = row
+        return self.matrix()
+
+    def matrix(self):
+        """Current rolling matrix, or None until the window is full."""
+        if self._count < self.window:
+            return None
+        return _corr_from_moments(self.window, self._sums, self._cross)
+
+
+class CorrelationEngine:
+    """
+    Full-window and rolling correlation of log returns for a watchlist.
+    The rolling state is kept between calls: when the same symbols come back with a
+    few more bars, only those bars are fed in instead of recomputing the window. The last
+    bar seen before is fed again in place, since a live candle may have been revised since.
+    """
+
+    def __init__(self, window=60):
+        self.window = window
+        self._symbols = None
+        self._last_ts = None
+        self._rolling = None
+
+    @profiler.timed("correlation")
+    def compute(self, closes):
+        """Returns (returns, full_corr, rolling_corr) as DataFrames; rolling_corr may be None."""
+        returns = align_log_returns(closes)
+        symbols = list(returns.columns)
+        values = returns.to_numpy()
+        full = pd.DataFrame(
+            np.corrcoef(values, rowvar=False) if len(values) > 1 else np.full((len(symbols),) * 2, np.nan),
+            index=symbols, columns=symbols,
+        )
+
+        if symbols == self._symbols and self._last_ts is not None and self._last_ts in returns.index:
+            start = returns.index.get_loc(self._last_ts)
+            self._rolling.replace_last(values[start])
+            start += 1
+        else:
+            self._rolling = RollingCorrelation(len(symbols), window=self.window)
+            start = 0
+        for row in values[start:]:
+            self._rolling.update(row)
+        self._symbols = symbols
+        self._last_ts = returns.index[-1] if len(returns) else None
+
+        matrix = self._rolling.matrix()
+        rolling = None if matrix is None else pd.DataFrame(matrix, index=symbols, columns=symbols)
+        return returns, full, rolling
+
+    @staticmethod
+    def cluster_order(corr):
+        """
+        Leaf order of an average-linkage clustering on 1 - corr, so correlated assets
+        sit next to each other in the heatmap.
+        """
+        n = len(corr)
+        if n <= 2:
+            return list(corr.index)
+        dist = 1.0 - np.nan_to_num(corr.to_numpy(), nan=0.0)
+        np.fill_diagonal(dist, np.inf)
+        clusters = {i: [i] for i in range(n)}
+        sizes = np.ones(n)
+        active = np.ones(n, dtype=bool)
+        for _ in range(n - 1):
+            masked = np.where(np.outer(active, active), dist, np.inf)
+            a, b = np.unravel_index(np.argmin(masked), masked.shape)
+            # Lance-Williams update for average linkage: merge b into a
+            dist[a] = (sizes[a] * dist[a] + sizes[b] * dist[b]) / (sizes[a] + sizes[b])
+            dist[:, a] = dist[a]
+            dist[a, a] = np.inf
+            sizes[a] += sizes[b]
+            active[b] = False
+            clusters[a] = clusters[a] + clusters.pop(b)
+        order = next(iter(clusters.values()))
+        return [corr.index[i] for i in order]
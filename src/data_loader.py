@@ -1,18 +1,56 @@
-import yfinance as yf
-import pandas as pd
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.data_store import get_default_store, period_start
+from src.profiler import profiler
 
 class DataLoader:  # <--- Make sure this name is exactly like this
-    def __init__(self, ticker, interval="1d"):
+    def __init__(self, ticker, interval="1d", store=None):
         self.ticker = ticker
         self.interval = interval
+        # Shared local OHLCV store: repeat calls only download bars newer than the last stored one
+        self.store = store or get_default_store()
 
     def fetch_data(self, period="1y"):
         print(f"Fetching data for {self.ticker}...")
-        data = yf.download(
-            tickers=self.ticker,
-            period=period,
-            interval=self.interval,
-            progress=False
-        )
-        data.dropna(inplace=True)
-        return data
\ No newline at end of file
+        with profiler.span("fetch", self.ticker):
+            data = self.store.get(self.ticker, interval=self.interval, period=period)
+            data.dropna(inplace=True)
+        return data
+
+    def fetch_compact(self, period="max", out_dir=None):
+        """
+        Bars as a CompactOHLCV (float32 columns, int64 timestamps) for long intraday histories.
+        Read from the store's Parquet file in batches, so the full float64 frame is never built;
+        the store is only asked to download when it has no file for this ticker yet.
+        """
+        from src.intraday import CompactOHLCV
+
+        path = self.store.parquet_path(self.ticker, self.interval)
+        if path is None:
+            data = self.fetch_data(period)
+            if data.empty:
+                return CompactOHLCV.from_frame(data.reindex(columns=['Open', 'High', 'Low', 'Close', 'Volume']))
+            path = self.store.parquet_path(self.ticker, self.interval)
+        with profiler.span("fetch", self.ticker):
+            return CompactOHLCV.from_parquet(path, out_dir=out_dir, start=period_start(period))
+
+    @staticmethod
+    def fetch_many(tickers, period="1y", interval="1d", max_workers=8, store=None):
+        """
+        Fetches several tickers concurrently and yields (ticker, df) as each one arrives.
+        Duplicate tickers are requested once; timeouts and retry/backoff are handled by the store,
+        and a ticker already loaded during this rerun is served from its in-process cache.
+        """
+        unique = list(dict.fromkeys(tickers))
+        if not unique:
+            return
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(unique))) as pool:
+            # Each fetch runs in a copy of the caller's context so its profiler span joins the caller's rerun
+            futures = {
+                pool.submit(contextvars.copy_context().run,
+                            DataLoader(ticker, interval=interval, store=store).fetch_data, period): ticker
+                for ticker in unique
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
@@ -0,0 +1,223 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+import pandas as pd
+
+# yfinance period strings mapped to how far back they reach
+PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+
+def period_start(period, now=None):
+    """Returns the first timestamp covered by a yfinance style period (None for 'max')."""
+    now = pd.Timestamp.now() if now is None else now
+    if period == "max":
+        return None
+    if period == "ytd":
+        return pd.Timestamp(year=now.year, month=1, day=1, tz=now.tz)
+    if period not in PERIOD_OFFSETS:
+        raise ValueError(f"Unsupported period: {period}")
+    return now - PERIOD_OFFSETS[period]
+
+
+def normalize_frame(df, ticker):
+    """Flattens the (field, ticker) MultiIndex yfinance returns for single tickers."""
+    if isinstance(df.columns, pd.MultiIndex):
+        if ticker in df.columns.get_level_values(-1):
+            df = df.xs(ticker, axis=1, level=-1)
+        else:
+            df.columns = df.columns.get_level_values(0)
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+    df.columns.name = None
+    return df
+
+
+class OHLCVStore:
+    """
+    Local Parquet store of OHLCV bars keyed by (symbol, interval).
+    - Disk layer: one Parquet file per key, extended incrementally with newer bars only.
+    - Memory layer: an LRU of loaded frames so every tab of a rerun shares one load.
+    """
+
+    def __init__(self, root=".data_store", max_items=64, refresh_seconds=60, fetcher=None,
+                 timeout=10, retries=2, backoff=0.5, empty_ttl=300):
+        self.root = root
+        self.max_items = max_items
+        self.refresh_seconds = refresh_seconds
+        self.timeout = timeout  # Per-request network timeout (seconds)
+        self.retries = retries  # Extra attempts after a failed download
+        self.backoff = backoff  # First retry delay, doubled on every attempt
+        self.empty_ttl = empty_ttl  # Seconds a ticker with no data is not asked for again
+        self.fetcher = fetcher or self._yf_fetch  # Swap in a local stand-in to run offline
+        self._cache = OrderedDict()  # key -> (frame, covered_from, last_refresh)
+        self._lock = threading.RLock()  # Guards the LRU and the index file
+        self._key_locks = defaultdict(threading.Lock)  # One fetch in flight per key
+        self._empty = {}  # key -> time of the last empty cold download (invalid/delisted tickers)
+        os.makedirs(self.root, exist_ok=True)
+
+    def _yf_fetch(self, ticker, interval, start=None, period=None):
+        import yfinance as yf
+
+        if start is not None:
+            return yf.download(tickers=ticker, start=start, interval=interval, progress=False,
+                               timeout=self.timeout, threads=False)
+        return yf.download(tickers=ticker, period=period, interval=interval, progress=False,
+                           timeout=self.timeout, threads=False)
+
+    def _fetch(self, ticker, interval, start=None, period=None):
+        """Calls the fetcher with retry + exponential backoff; returns an empty frame on failure."""
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            try:
+                df = normalize_frame(self.fetcher(ticker, interval, start=start, period=period), ticker)
+                # An empty cold download is usually a transient Yahoo failure, not "no data"
+                if not df.empty or start is not None:
+                    return df
+            except Exception as e:
+                print(f"Fetch Error ({ticker}, attempt {attempt + 1}): {e}")
+            if attempt < self.retries:
+                time.sleep(delay)
+                delay *= 2
+        return pd.DataFrame()
+
+    def _path(self, ticker, interval):
+        safe = ticker.replace("^", "_").replace("/", "_")
+        return os.path.join(self.root, f"{safe}__{interval}.parquet")
+
+    def parquet_path(self, ticker, interval="1d"):
+        """On-disk file for a key (None until it has been fetched once), for out-of-core readers."""
+        path = self._path(ticker, interval)
+        return path if os.path.exists(path) else None
+
+    def _index_path(self):
+        return os.path.join(self.root, "index.json")
+
+    def _read_index(self):
+        try:
+            with open(self._index_path()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self, key, covered_from):
+        index = self._read_index()
+        index[key] = None if covered_from is None else covered_from.isoformat()
+        with open(self._index_path(), "w") as f:
+            json.dump(index, f)
+
+    def _load_disk(self, ticker, interval):
+        path = self._path(ticker, interval)
+        if not os.path.exists(path):
+            return None, None
+        df = pd.read_parquet(path)
+        index = self._read_index()
+        key = f"{ticker}|{interval}"
+        if key in index and index[key] is None:
+            return df, None  # Stored with period='max'
+        return df, pd.Timestamp(index.get(key) or df.index[0])
+
+    def _save_disk(self, ticker, interval, df, covered_from):
+        path = self._path(ticker, interval)
+        tmp = path + ".tmp"
+        df.to_parquet(tmp)
+        os.replace(tmp, path)  # Atomic swap so a crashed write never corrupts the store
+        with self._lock:
+            self._write_index(f"{ticker}|{interval}", covered_from)
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_items:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _align_tz(ts, index):
+        """Matches a timestamp's timezone to the stored index so comparisons work."""
+        if ts is None:
+            return None
+        if index.tz is not None and ts.tz is None:
+            return ts.tz_localize(index.tz)
+        if index.tz is None and ts.tz is not None:
+            return ts.tz_convert(None)
+        return ts
+
+    def _covers(self, covered_from, start):
+        if covered_from is None:
+            return True  # Stored 'max' history covers every period
+        if start is None:
+            return False
+        return covered_from <= self._align_tz(start, pd.DatetimeIndex([covered_from]))
+
+    def get(self, ticker, interval="1d", period="1y"):
+        """Returns `period` of bars, downloading only what the store does not already hold."""
+        key = (ticker, interval)
+        with self._lock:
+            key_lock = self._key_locks[key]
+        with key_lock:
+            with self._lock:
+                entry = self._cache.get(key)
+            if entry is None:
+                df, covered_from = self._load_disk(ticker, interval)
+                entry = (df, covered_from, 0.0) if df is not None else None
+
+            start = period_start(period)
+            now = time.time()
+            if entry is None or not self._covers(entry[1], start):
+                # Cold or too short: fetch the whole requested window once
+                if entry is None and now - self._empty.get(key, -self.empty_ttl) < self.empty_ttl:
+                    return pd.DataFrame()  # Came back empty after retries moments ago
+                fresh = self._fetch(ticker, interval, period=period)
+                if fresh.empty and entry is None:
+                    self._empty[key] = now
+                    return fresh
+                if not fresh.empty:
+                    df = fresh if entry is None else pd.concat([entry[0], fresh])
+                    df = normalize_frame(df, ticker)
+                    covered_from = None if start is None else self._align_tz(start, df.index)
+                    self._save_disk(ticker, interval, df, covered_from)
+                    entry = (df, covered_from, now)
+            elif now - entry[2] >= self.refresh_seconds:
+                # Warm: only pull bars from the last stored timestamp onwards
+                df, covered_from, _ = entry
+                fresh = self._fetch(ticker, interval, start=df.index[-1])  # Empty when offline
+                if not fresh.empty:
+                    df = normalize_frame(pd.concat([df, fresh]), ticker)
+                    self._save_disk(ticker, interval, df, covered_from)
+                entry = (df, covered_from, now)
+
+            self._remember(key, entry)
+            df = entry[0]
+
+        if start is not None:
+            df = df[df.index >= self._align_tz(start, df.index)]
+        return df.copy()
+
+    def clear(self):
+        """Drops the in-process layer; the Parquet files stay on disk."""
+        with self._lock:
+            self._cache.clear()
+            self._empty.clear()
+
+
+_default_store = None
+
+
+def get_default_store():
+    """Process-wide store shared by every DataLoader (survives Streamlit reruns)."""
+    global _default_store
+    if _default_store is None:
+        _default_store = OHLCVStore(root=os.getenv("DATA_STORE_DIR", ".data_store"))
+    return _default_store
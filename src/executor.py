@@ -0,0 +1,295 @@
+import asyncio
+import itertools
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+
+class SimulatedExchange:
+    """
+    In-process stand-in for a ccxt async client (create_order / fetch_order / cancel_order / close).
+    Each symbol has a depth-limited order book around a mid price; orders are acknowledged after
+    `ack_latency` and filled in slices every `fill_latency`, so large orders fill partially
+    across several book refreshes.
+    """
+
+    def __init__(self, mid_prices, levels=10, level_size=1.0, spread=0.0005, step=0.0005,
+                 replenish=0.5, ack_latency=0.005, fill_latency=0.01, jitter=0.0, seed=None):
+        self.levels = levels
+        self.level_size = level_size
+        self.spread = spread  # Half-spread as a fraction of mid
+        self.step = step  # Distance between book levels as a fraction of mid
+        self.replenish = replenish  # Fraction of consumed depth restored per fill slice
+        self.ack_latency = ack_latency
+        self.fill_latency = fill_latency
+        self.jitter = jitter  # Extra uniform random latency (seconds)
+        self.mid = dict(mid_prices)
+        self.books = {symbol: self._fresh_book(symbol) for symbol in self.mid}
+        self.orders = {}
+        self._ids = itertools.count(1)
+        self._tasks = set()
+        self._random = random.Random(seed)
+
+    def _fresh_book(self, symbol):
+        mid = self.mid[symbol]
+        offsets = self.spread + self.step * np.arange(self.levels)
+        return {
+            'asks': [[mid * (1 + o), self.level_size] for o in offsets],
+            'bids': [[mid * (1 - o), self.level_size] for o in offsets],
+        }
+
+    async def _delay(self, base):
+        await asyncio.sleep(base + self._random.uniform(0, self.jitter))
+
+    async def create_order(self, symbol, type, side, amount, price=None, params=None):
+        await self._delay(self.ack_latency)
+        order = {
+            'id': str(next(self._ids)), 'symbol': symbol, 'type': type, 'side': side,
+            'price': price, 'amount': amount, 'filled': 0.0, 'remaining': amount,
+            'cost': 0.0, 'average': None, 'status': 'open', 'trades': [],
+            'timestamp': int(time.time() * 1000), 'lastTradeTimestamp': None,
+        }
+        self.orders[order['id']] = order
+        task = asyncio.create_task(self._fill(order))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return dict(order)
+
+    async def _fill(self, order):
+        book_side = 'asks' if order['side'] == 'buy' else 'bids'
+        while order['status'] == 'open' and order['remaining'] > 1e-12:
+            await self._delay(self.fill_latency)
+            book = self.books[order['symbol']][book_side]
+            for level in book:
+                level_price, size = level
+                crosses = order['type'] == 'market' or (
+                    level_price <= order['price'] if order['side'] == 'buy' else level_price >= order['price']
+                )
+                if not crosses or order['remaining'] <= 1e-12:
+                    break
+                qty = min(size, order['remaining'])
+                if qty <= 0:
+                    continue
+                level[1] -= qty
+                order['filled'] += qty
+                order['remaining'] -= qty
+                order['cost'] += qty * level_price
+                order['trades'].append({'price': level_price, 'amount': qty, 'timestamp': int(time.time() * 1000)})
+                order['lastTradeTimestamp'] = order['trades'][-1]['timestamp']
+            if order['filled']:
+                order['average'] = order['cost'] / order['filled']
+            # Liquidity comes back gradually, which is what makes big orders fill in pieces
+            for level in book:
+                level[1] += (self.level_size - level[1]) * self.replenish
+        if order['remaining'] <= 1e-12:
+            order['remaining'] = 0.0
+            order['status'] = 'closed'
+
+    async def fetch_order(self, id, symbol=None, params=None):
+        await self._delay(self.ack_latency)
+        return dict(self.orders[id])
+
+    async def cancel_order(self, id, symbol=None, params=None):
+        await self._delay(self.ack_latency)
+        order = self.orders[id]
+        if order['status'] == 'open':
+            order['status'] = 'canceled'
+        return dict(order)
+
+    async def close(self):
+        for task in list(self._tasks):
+            task.cancel()
+
+
+class RateLimiter:
+    """Async token bucket: at most `rate` acquisitions per second with bursts up to `burst`."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class ExecutionEngine:
+    """
+    Routes orders to exchange clients concurrently and records submit -> ack -> fill latency.
+    One client per exchange is kept for the engine's lifetime (ccxt async clients hold their
+    own pooled aiohttp session), and every exchange gets a client-side rate limiter.
+    """
+
+    def __init__(self, clients, rate_limits=None, max_concurrency=64, poll_interval=0.05, fill_timeout=30.0):
+        self.clients = dict(clients)
+        rate_limits = rate_limits or {}
+        self.limiters = {name: RateLimiter(rate_limits.get(name, 10)) for name in self.clients}
+        self.poll_interval = poll_interval
+        self.fill_timeout = fill_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.records = []
+
+    @classmethod
+    def from_ccxt(cls, configs, **kwargs):
+        """
+        Builds ccxt async clients, e.g. from_ccxt({'binance': {'apiKey': ..., 'secret': ...}}).
+        The exchange's own rateLimit becomes the client-side limit unless one is given.
+        """
+        import ccxt.async_support as ccxt_async
+
+        clients, rate_limits = {}, kwargs.pop('rate_limits', {})
+        for exchange_id, config in configs.items():
+            client = getattr(ccxt_async, exchange_id)({'enableRateLimit': False, **config})
+            clients[exchange_id] = client
+            rate_limits.setdefault(exchange_id, 1000.0 / client.rateLimit)
+        return cls(clients, rate_limits=rate_limits, **kwargs)
+
+    @staticmethod
+    def _fill_times(order, clock):
+        """
+        (first fill, last fill) from the exchange's own trade timestamps (epoch ms), moved onto the
+        perf_counter timeline with `clock` = time.time() - time.perf_counter(). None when the
+        exchange reports neither trades nor lastTradeTimestamp.
+        """
+        stamps = [trade['timestamp'] for trade in order.get('trades') or [] if trade.get('timestamp')]
+        first = min(stamps) if stamps else None
+        last = max(stamps) if stamps else order.get('lastTradeTimestamp')
+        return tuple(None if ms is None else ms / 1000 - clock for ms in (first, last))
+
+    async def submit(self, exchange, symbol, side, amount, type='market', price=None):
+        """
+        Places one order, waits for it to fill and returns its latency record. An order still
+        open after `fill_timeout`, or left behind by an error after it was placed, is cancelled
+        and recorded with its final exchange state.
+        'queued' is when the call arrived; 'submit' is stamped once the concurrency slot and
+        rate-limit token are held, so local queueing is reported separately from submit->ack.
+        Fill times come from the exchange's trade timestamps; the poll that noticed the fill
+        is only used when the exchange reports none.
+        """
+        client = self.clients[exchange]
+        record = {'exchange': exchange, 'symbol': symbol, 'side': side, 'amount': amount,
+                  'status': 'error', 'filled': 0.0, 'average': None, 'queued': time.perf_counter(),
+                  'submit': None, 'ack': None, 'first_fill': None, 'fill': None}
+        order = None
+        async with self._semaphore:
+            try:
+                await self.limiters[exchange].acquire()
+                record['submit'] = time.perf_counter()
+                order = await client.create_order(symbol, type, side, amount, price)
+                record['ack'] = time.perf_counter()
+                clock = time.time() - record['ack']
+                record['id'] = order['id']
+                deadline = record['ack'] + self.fill_timeout
+                seen_fill = None  # Poll-observed fallback
+                while order['status'] == 'open' and time.perf_counter() < deadline:
+                    await asyncio.sleep(self.poll_interval)
+                    await self.limiters[exchange].acquire()
+                    order = await client.fetch_order(order['id'], symbol)
+                    if order['filled'] and seen_fill is None:
+                        seen_fill = time.perf_counter()
+                if order['status'] == 'open':
+                    # Timed out: never leave an unmanaged order resting on the book
+                    await self.limiters[exchange].acquire()
+                    order = await client.cancel_order(order['id'], symbol)
+                if order['filled']:
+                    first_fill, last_fill = self._fill_times(order, clock)
+                    # Exchange clocks are ms-resolution and may be skewed: never before the ack
+                    record['first_fill'] = max(first_fill, record['ack']) if first_fill is not None else seen_fill
+                    if order['status'] == 'closed':
+                        record['fill'] = max(last_fill, record['ack']) if last_fill is not None else time.perf_counter()
+                        record['first_fill'] = record['first_fill'] or record['fill']
+                record.update(status=order['status'], filled=order['filled'], average=order['average'])
+            except Exception as e:
+                print(f"Order Error ({exchange} {side} {symbol}): {e}")
+                if order is not None and order.get('status') == 'open':
+                    await self._cancel_after_error(exchange, order, record)
+        self.records.append(record)
+        return record
+
+    async def _cancel_after_error(self, exchange, order, record):
+        """Best-effort cancel of an order that was placed before a later call failed."""
+        try:
+            await self.limiters[exchange].acquire()
+            order = await self.clients[exchange].cancel_order(order['id'], order.get('symbol'))
+            record.update(status=order['status'], filled=order['filled'], average=order['average'])
+        except Exception as e:
+            print(f"Cancel Error ({exchange} {order['id']}): {e}")
+
+    async def submit_many(self, orders):
+        """Submits a list of order dicts (keys match `submit`) concurrently."""
+        return await asyncio.gather(*(self.submit(**order) for order in orders))
+
+    @staticmethod
+    def orders_from_signals(scan, exchange, notional, symbol_map=None):
+        """
+        Turns a per-symbol table with 'Signal' and 'Price' (PanelScanner.scan output or the
+        last rows of generate_signals) into market orders of `notional` quote currency each.
+        """
+        symbol_map = symbol_map or {}
+        orders = []
+        for symbol, row in scan.iterrows():
+            if row['Signal'] == 0 or not row['Price'] > 0:
+                continue
+            orders.append({
+                'exchange': exchange, 'symbol': symbol_map.get(symbol, symbol),
+                'side': 'buy' if row['Signal'] == 1 else 'sell', 'amount': notional / row['Price'],
+            })
+        return orders
+
+    def latency_report(self):
+        """Per-stage latency percentiles (ms) and throughput over every recorded order."""
+        if not self.records:
+            return pd.DataFrame()
+        df = pd.DataFrame(self.records)
+        stages = {
+            'queue': df['submit'] - df['queued'],
+            'submit->ack': df['ack'] - df['submit'],
+            'ack->first fill': df['first_fill'] - df['ack'],
+            'ack->fill': df['fill'] - df['ack'],
+            'submit->fill': df['fill'] - df['submit'],
+        }
+        report = pd.DataFrame({
+            name: (values.dropna() * 1000).quantile([0.5, 0.95, 0.99]).to_list() + [values.notna().sum()]
+            for name, values in stages.items()
+        }, index=['p50 (ms)', 'p95 (ms)', 'p99 (ms)', 'count']).T
+        elapsed = df['fill'].max() - df['queued'].min()
+        report.attrs['throughput (orders/s)'] = df['fill'].notna().sum() / elapsed if elapsed > 0 else float('nan')
+        return report
+
+    async def close(self):
+        for client in self.clients.values():
+            await client.close()
+
+
+async def load_test(n_orders=1000, symbols=("BTC/USDT", "ETH/USDT", "SOL/USDT"), rate_limit=500,
+                    max_concurrency=128, **exchange_kwargs):
+    """Offline load test of the full order path against the simulated exchange."""
+    exchange = SimulatedExchange({symbol: 100.0 * (i + 1) for i, symbol in enumerate(symbols)}, **exchange_kwargs)
+    engine = ExecutionEngine({'sim': exchange}, rate_limits={'sim': rate_limit},
+                             max_concurrency=max_concurrency, poll_interval=0.002)
+    rng = random.Random(0)
+    orders = [{'exchange': 'sim', 'symbol': rng.choice(symbols), 'side': rng.choice(('buy', 'sell')),
+               'amount': rng.uniform(0.1, 3.0)} for _ in range(n_orders)]
+    try:
+        await engine.submit_many(orders)
+    finally:
+        await engine.close()
+    return engine.latency_report()
+
+
+if __name__ == "__main__":
+    report = asyncio.run(load_test())
+    print(report)
+    print(f"Throughput: {report.attrs['throughput (orders/s)']:.1f} orders/s")
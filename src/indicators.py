@@ -0,0 +1,257 @@
+import math
+import numbers
+from collections import deque
+
+NAN = float('nan')
+
+
+def _close_of(bar):
+    """Accepts a raw close price or any bar mapping/Series with a 'Close' field."""
+    # Mappings and Series have keys(); NumPy scalars/arrays also define __getitem__ but are prices
+    if not isinstance(bar, numbers.Real) and hasattr(bar, 'keys'):
+        bar = bar['Close']
+    return float(bar.item() if hasattr(bar, 'item') else bar)
+
+
+class EMA:
+    """
+    Streaming exponential moving average (pandas ewm(adjust=False) recursion).
+    O(1) per update; NaN until `min_periods` observations have been seen.
+    """
+
+    def __init__(self, span=None, alpha=None, min_periods=0):
+        self.alpha = alpha if alpha is not None else 2.0 / (1.0 + span)
+        self.min_periods = min_periods
+        self.value = NAN
+        self.nobs = 0
+
+    def update(self, x):
+        if x != x:  # NaN input: nothing observed (leading NaNs of a MACD line, for example)
+            return self.snapshot()
+        self.nobs += 1
+        if self.value != self.value:
+            self.value = x
+        elif self.value != x:
+            # Same operation order as pandas so both paths round identically
+            old_wt = 1.0 - self.alpha
+            self.value = (old_wt * self.value + self.alpha * x) / (old_wt + self.alpha)
+        return self.snapshot()
+
+    def snapshot(self):
+        return self.value if self.nobs >= max(self.min_periods, 1) else NAN
+
+
+class RollingSMA:
+    """Streaming rolling mean with compensated add/remove, like pandas rolling().mean()."""
+
+    def __init__(self, window):
+        self.window = window
+        self._values = deque()
+        self._sum = 0.0
+        self._compensation = 0.0
+        self._neg_ct = 0
+        self._same_ct = 0
+        self._prev = NAN
+
+    def _add(self, x):
+        y = x - self._compensation
+        t = self._sum + y
+        self._compensation = t - self._sum - y
+        self._sum = t
+        if math.copysign(1.0, x) < 0:
+            self._neg_ct += 1
+        self._same_ct = self._same_ct + 1 if x == self._prev else 1
+        self._prev = x
+
+    def _remove(self, x):
+        y = -x - self._compensation
+        t = self._sum + y
+        self._compensation = t - self._sum - y
+        self._sum = t
+        if math.copysign(1.0, x) < 0:
+            self._neg_ct -= 1
+
+    def update(self, x):
+        self._values.append(x)
+        if len(self._values) > self.window:
+            old = self._values.popleft()
+            if self.window == 1:
+                # pandas restarts the accumulator when windows do not overlap
+                self._sum = self._compensation = 0.0
+                self._neg_ct = self._same_ct = 0
+                self._prev = NAN
+            else:
+                self._remove(old)
+        self._add(x)
+        return self.snapshot()
+
+    def snapshot(self):
+        nobs = len(self._values)
+        if nobs < self.window:
+            return NAN
+        result = self._sum / nobs
+        if self._same_ct >= nobs:
+            return self._prev
+        if self._neg_ct == 0 and result < 0:
+            return 0.0
+        if self._neg_ct == nobs and result > 0:
+            return 0.0
+        return result
+
+
+class RollingVariance:
+    """Streaming rolling variance/std with Welford add/remove (pandas rolling().var())."""
+
+    def __init__(self, window, ddof=0):
+        self.window = window
+        self.ddof = ddof
+        self._values = deque()
+        self._mean = 0.0
+        self._ssqdm = 0.0
+        self._compensation = 0.0
+        self._same_ct = 0
+        self._prev = NAN
+
+    def _reset(self):
+        self._mean = self._ssqdm = self._compensation = 0.0
+        self._same_ct = 0
+        self._prev = NAN
+
+    def _add(self, x, nobs):
+        self._same_ct = self._same_ct + 1 if x == self._prev else 1
+        self._prev = x
+        prev_mean = self._mean - self._compensation
+        y = x - self._compensation
+        t = y - self._mean
+        self._compensation = t + self._mean - y
+        self._mean += t / nobs
+        self._ssqdm += (x - prev_mean) * (x - self._mean)
+
+    def _remove(self, x, nobs):
+        if nobs == 0:
+            self._mean = self._ssqdm = 0.0
+            return
+        prev_mean = self._mean - self._compensation
+        y = x - self._compensation
+        t = y - self._mean
+        self._compensation = t + self._mean - y
+        self._mean -= t / nobs
+        self._ssqdm -= (x - prev_mean) * (x - self._mean)
+
+    def update(self, x):
+        if self.window == 1 and self._values:
+            self._values.popleft()
+            self._reset()
+        self._values.append(x)
+        # pandas adds the new observation before removing the expired one
+        self._add(x, len(self._values))
+        if len(self._values) > self.window:
+            self._remove(self._values.popleft(), len(self._values))
+        return self.snapshot()
+
+    def snapshot(self):
+        nobs = len(self._values)
+        if nobs < self.window or nobs <= self.ddof:
+            return NAN
+        if nobs == 1 or self._same_ct >= nobs:
+            return 0.0
+        return max(self._ssqdm / (nobs - self.ddof), 0.0)
+
+    def std(self):
+        var = self.snapshot()
+        return math.sqrt(var) if var == var else NAN
+
+
+class WilderRSI:
+    """Streaming Wilder RSI (ewm alpha=1/window), matching ta's RSIIndicator."""
+
+    def __init__(self, window=14):
+        self.window = window
+        self._up = EMA(alpha=1 / window, min_periods=window)
+        self._down = EMA(alpha=1 / window, min_periods=window)
+        self._last_close = None
+
+    def update(self, close):
+        # ta turns the undefined first difference into 0.0, which seeds both averages
+        diff = 0.0 if self._last_close is None else close - self._last_close
+        self._last_close = close
+        self._up.update(diff if diff > 0 else 0.0)
+        self._down.update(-diff if diff < 0 else -0.0)
+        return self.snapshot()
+
+    def snapshot(self):
+        up, down = self._up.snapshot(), self._down.snapshot()
+        if down == 0:
+            return 100.0
+        return 100 - (100 / (1 + up / down))
+
+
+class MACDStream:
+    """Streaming MACD line, signal line and histogram (ta defaults 12/26/9)."""
+
+    def __init__(self, window_fast=12, window_slow=26, window_sign=9):
+        self._fast = EMA(span=window_fast, min_periods=window_fast)
+        self._slow = EMA(span=window_slow, min_periods=window_slow)
+        self._signal = EMA(span=window_sign, min_periods=window_sign)
+        self.macd = NAN
+
+    def update(self, close):
+        self.macd = self._fast.update(close) - self._slow.update(close)
+        self._signal.update(self.macd)
+        return self.snapshot()
+
+    def snapshot(self):
+        signal = self._signal.snapshot()
+        return {'MACD': self.macd, 'MACD_Signal': signal, 'MACD_Diff': self.macd - signal}
+
+
+class BollingerStream:
+    """Streaming Bollinger Bands: rolling mean +/- window_dev population std."""
+
+    def __init__(self, window=20, window_dev=2):
+        self.window_dev = window_dev
+        self._mean = RollingSMA(window)
+        self._var = RollingVariance(window, ddof=0)
+
+    def update(self, close):
+        self._mean.update(close)
+        self._var.update(close)
+        return self.snapshot()
+
+    def snapshot(self):
+        mid, std = self._mean.snapshot(), self._var.std()
+        return {'BB_High': mid + self.window_dev * std, 'BB_Low': mid - self.window_dev * std, 'BB_Mid': mid}
+
+
+class IncrementalIndicators:
+    """
+    Every column of TradingStrategy.add_indicators, maintained bar by bar.
+    update(bar) costs O(1) regardless of how much history has been seen.
+    """
+
+    def __init__(self, rsi_period=14, sma_fast=20, sma_slow=50, bb_period=20, bb_std=2):
+        self.rsi = WilderRSI(rsi_period)
+        self.sma_fast = RollingSMA(sma_fast)
+        self.sma_slow = RollingSMA(sma_slow)
+        self.macd = MACDStream()
+        self.bb = BollingerStream(bb_period, bb_std)
+        self.close = NAN
+
+    def update(self, bar):
+        self.close = _close_of(bar)
+        self.rsi.update(self.close)
+        self.sma_fast.update(self.close)
+        self.sma_slow.update(self.close)
+        self.macd.update(self.close)
+        self.bb.update(self.close)
+        return self.snapshot()
+
+    def snapshot(self):
+        return {
+            'Close': self.close,
+            'RSI': self.rsi.snapshot(),
+            'SMA_Fast': self.sma_fast.snapshot(),
+            'SMA_Slow': self.sma_slow.snapshot(),
+            **self.macd.snapshot(),
+            **self.bb.snapshot(),
+        }
@@ -0,0 +1,258 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.data_loader import DataLoader
+from src.strategy import TradingStrategy
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+DEFAULT_CHUNK = 250_000  # Bars per chunk: ~2 MB per float64 temporary
+
+
+class CompactOHLCV:
+    """
+    OHLCV bars as int64 timestamps (ns) plus one float32 array per column: 28 bytes per bar
+    instead of ~48 for a float64 frame, before any indicator columns. Arrays can be saved as
+    .npy files and re-opened memory-mapped, so only the chunk being processed is paged in.
+    Prices keep float32's ~7 significant digits, plenty for exchange quotes.
+    """
+
+    def __init__(self, timestamps, columns, tz=None):
+        self.timestamps = timestamps
+        self.columns = columns  # name -> float32 array
+        self.tz = tz  # Timestamps are UTC-based when set, wall-clock otherwise
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    @property
+    def nbytes(self):
+        return self.timestamps.nbytes + sum(values.nbytes for values in self.columns.values())
+
+    @classmethod
+    def from_frame(cls, df):
+        """Compacts a DataLoader frame (extra columns are ignored)."""
+        index = pd.DatetimeIndex(df.index).as_unit('ns')
+        columns = {name: np.ascontiguousarray(df[name].to_numpy().reshape(-1), dtype=np.float32)
+                   for name in OHLCV_COLUMNS}
+        return cls(index.asi8.copy(), columns, tz=None if index.tz is None else str(index.tz))
+
+    @classmethod
+    def from_parquet(cls, path, out_dir=None, batch_size=DEFAULT_CHUNK, start=None):
+        """
+        Streams a Parquet file (e.g. an OHLCVStore file) into compact arrays batch by batch,
+        so no full float64 frame is ever built. With `out_dir` the arrays are written straight to
+        memory-mapped .npy files there. Bars before `start` (a Timestamp) are skipped.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(path)
+        time_column = parquet.schema_arrow.pandas_metadata['index_columns'][0]
+        tz = parquet.schema_arrow.field(time_column).type.tz
+        start_ns = None
+        if start is not None:
+            start = pd.Timestamp(start)
+            if tz is not None:
+                start = start.tz_localize(tz) if start.tz is None else start
+                start_ns = start.tz_convert('UTC').as_unit('ns').value
+            else:
+                start_ns = (start.tz_convert(None) if start.tz is not None else start).as_unit('ns').value
+
+        n = parquet.metadata.num_rows  # Upper bound when `start` trims the head
+        timestamps, columns = cls._allocate(n, out_dir)
+        filled = 0
+        for batch in parquet.iter_batches(batch_size=batch_size, columns=[time_column, *OHLCV_COLUMNS]):
+            ts = batch.column(time_column).cast(pa.timestamp('ns', tz=tz)).cast(pa.int64()).to_numpy()
+            keep = slice(None) if start_ns is None else ts >= start_ns
+            ts = ts[keep]
+            timestamps[filled:filled + len(ts)] = ts
+            for name in OHLCV_COLUMNS:
+                values = batch.column(name).to_numpy(zero_copy_only=False)
+                columns[name][filled:filled + len(ts)] = values[keep]
+            filled += len(ts)
+
+        bars = cls(timestamps[:filled], {name: values[:filled] for name, values in columns.items()}, tz=tz)
+        if out_dir is not None:
+            bars._write_meta(out_dir, filled)
+        return bars
+
+    @staticmethod
+    def _allocate(n, out_dir):
+        if out_dir is None:
+            return np.empty(n, dtype=np.int64), {name: np.empty(n, dtype=np.float32) for name in OHLCV_COLUMNS}
+        os.makedirs(out_dir, exist_ok=True)
+        open_memmap = np.lib.format.open_memmap
+        timestamps = open_memmap(os.path.join(out_dir, "timestamps.npy"), mode="w+", dtype=np.int64, shape=(n,))
+        columns = {name: open_memmap(os.path.join(out_dir, f"{name}.npy"), mode="w+", dtype=np.float32, shape=(n,))
+                   for name in OHLCV_COLUMNS}
+        return timestamps, columns
+
+    def _write_meta(self, out_dir, length):
+        with open(os.path.join(out_dir, "meta.json"), "w") as f:
+            json.dump({'tz': self.tz, 'length': int(length)}, f)
+
+    def save(self, out_dir):
+        """Writes one .npy file per array (re-open with load(out_dir) to memory-map them)."""
+        timestamps, columns = self._allocate(len(self), out_dir)
+        timestamps[:] = self.timestamps
+        for name, values in self.columns.items():
+            columns[name][:] = values
+        self._write_meta(out_dir, len(self))
+
+    @classmethod
+    def load(cls, out_dir, mmap=True):
+        with open(os.path.join(out_dir, "meta.json")) as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        length = meta['length']
+        timestamps = np.load(os.path.join(out_dir, "timestamps.npy"), mmap_mode=mode)[:length]
+        columns = {name: np.load(os.path.join(out_dir, f"{name}.npy"), mmap_mode=mode)[:length]
+                   for name in OHLCV_COLUMNS}
+        return cls(timestamps, columns, tz=meta['tz'])
+
+    def index(self, start=0, stop=None):
+        """DatetimeIndex of bars [start, stop)."""
+        ts = self.timestamps[start:stop]
+        if self.tz is None:
+            return pd.DatetimeIndex(ts.astype('datetime64[ns]'))
+        return pd.DatetimeIndex(ts.astype('datetime64[ns]')).tz_localize('UTC').tz_convert(self.tz)
+
+    def to_frame(self, start=0, stop=None):
+        """Regular float64 OHLCV frame for a slice (e.g. the last few days for plotting)."""
+        return pd.DataFrame({name: self.columns[name][start:stop].astype(np.float64) for name in OHLCV_COLUMNS},
+                            index=self.index(start, stop))
+
+    def chunk_bounds(self, chunk_size=DEFAULT_CHUNK):
+        return [(start, min(start + chunk_size, len(self))) for start in range(0, len(self), chunk_size)]
+
+
+def _ewm(values, alpha, state):
+    """
+    ewm(alpha, adjust=False).mean() of one chunk, continuing from the previous chunk's last
+    output `state` (None for the first chunk). Same pandas recursion, so no drift at chunk edges.
+    """
+    if state is None:
+        return pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return pd.Series(np.concatenate(([state], values))).ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
+
+
+class ChunkedIndicators:
+    """
+    RSI, Bollinger Bands and MACD histogram (the signal inputs) computed chunk by chunk.
+    EMA-based indicators carry their smoothing state across chunks, so they equal a single
+    pass exactly; rolling windows overlap the previous chunk by `bb_period - 1` bars
+    (differences stay at float rounding level).
+    """
+
+    def __init__(self, strategy=None):
+        self.strategy = strategy or TradingStrategy()
+        self.seen = 0
+        self._prev_close = None
+        self._tail = np.empty(0)  # Last bb_period - 1 closes for the rolling window overlap
+        self._state = {}  # EMA name -> last output
+
+    @property
+    def warmup(self):
+        """Leading bars that have a NaN in any add_indicators column (dropped by the daily backtest)."""
+        s = self.strategy
+        return max(s.sma_slow, s.sma_fast, s.bb_period, s.rsi_period, 26 + 9 - 1) - 1
+
+    def _ema(self, name, values, alpha):
+        out = _ewm(values, alpha, self._state.get(name))
+        if len(out):
+            self._state[name] = out[-1]
+        return out
+
+    def update(self, close):
+        """Indicators (float64) for the next chunk of closes."""
+        s = self.strategy
+        close = np.asarray(close, dtype=np.float64)
+        n = len(close)
+        position = np.arange(self.seen, self.seen + n)  # Bar numbers since the first chunk
+
+        # 1. RSI (Wilder smoothing, first difference seeded with 0 like ta)
+        diff = np.diff(close, prepend=close[0] if self._prev_close is None else self._prev_close)
+        up = self._ema('up', np.where(diff > 0, diff, 0.0), 1 / s.rsi_period)
+        down = self._ema('down', np.where(diff < 0, -diff, 0.0), 1 / s.rsi_period)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(down == 0, 100.0, 100 - (100 / (1 + up / down)))
+        rsi[position < s.rsi_period - 1] = np.nan
+
+        # 2. Bollinger Bands (population std, like ta) over the overlapped window
+        window = pd.Series(np.concatenate((self._tail, close))).rolling(s.bb_period, min_periods=s.bb_period)
+        bb_mid = window.mean().to_numpy()[-n:]
+        bb_std = window.std(ddof=0).to_numpy()[-n:]
+
+        # 3. MACD 12/26/9 (ta defaults); the signal EMA starts at the first complete MACD value
+        macd = self._ema('fast', close, 2.0 / 13.0) - self._ema('slow', close, 2.0 / 27.0)
+        macd[position < 25] = np.nan
+        macd_signal = np.full(n, np.nan)
+        valid = position >= 25
+        macd_signal[valid] = self._ema('signal', macd[valid], 2.0 / 10.0)
+        macd_signal[position < 25 + 9 - 1] = np.nan
+
+        self.seen += n
+        self._prev_close = close[-1]
+        self._tail = np.concatenate((self._tail, close))[-(s.bb_period - 1):] if s.bb_period > 1 else np.empty(0)
+        return {
+            'RSI': rsi,
+            'BB_High': bb_mid + s.bb_std * bb_std,
+            'BB_Low': bb_mid - s.bb_std * bb_std,
+            'MACD_Diff': macd - macd_signal,
+        }
+
+
+def stream_signals(bars, strategy=None, chunk_size=DEFAULT_CHUNK):
+    """
+    Yields (start, stop, indicators, signal) per chunk of a CompactOHLCV. Indicators are
+    float32 and the signal is int8; memory stays bounded by the chunk size.
+    """
+    engine = ChunkedIndicators(strategy)
+    for start, stop in bars.chunk_bounds(chunk_size):
+        close = np.asarray(bars['Close'][start:stop], dtype=np.float64)
+        ind = engine.update(close)
+        signal = TradingStrategy.signal_from_arrays(close, ind['RSI'], ind['BB_Low'], ind['BB_High'], ind['MACD_Diff'])
+        yield start, stop, {name: values.astype(np.float32) for name, values in ind.items()}, signal
+
+
+def signal_chunks(bars, strategy=None, chunk_size=DEFAULT_CHUNK):
+    """(index, close, signal) chunks for Backtester.run_stream, skipping the indicator warm-up bars."""
+    warmup = ChunkedIndicators(strategy).warmup
+    for start, stop, _, signal in stream_signals(bars, strategy, chunk_size):
+        skip = max(0, min(warmup - start, stop - start))
+        if skip < stop - start:
+            yield bars.index(start + skip, stop), bars['Close'][start + skip:stop], signal[skip:]
+
+
+def main():
+    from backtests.backtest import Backtester
+
+    parser = argparse.ArgumentParser(description="Chunked backtest of long intraday histories from the OHLCV store.")
+    parser.add_argument("symbol")
+    parser.add_argument("--interval", default="1m")
+    parser.add_argument("--period", default="max")
+    parser.add_argument("--capital", type=float, default=10000)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK)
+    parser.add_argument("--cache-dir", help="Keep the compact arrays here as memory-mapped .npy files")
+    args = parser.parse_args()
+
+    bars = DataLoader(args.symbol, interval=args.interval).fetch_compact(args.period, out_dir=args.cache_dir)
+    if not len(bars):
+        print(f"No {args.interval} bars stored for {args.symbol}")
+        return
+    balance, ret, trades, _, _ = Backtester(args.capital).run_stream(
+        signal_chunks(bars, chunk_size=args.chunk_size), keep_equity=False
+    )
+    print(f"{args.symbol} {args.interval}: {len(bars):,} bars ({bars.nbytes / 2**20:.1f} MB compact)")
+    print(f"Final balance ${balance:,.2f} | Return {ret:.2f}% | Trades {trades}")
+
+
+if __name__ == "__main__":
+    main()
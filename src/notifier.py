@@ -1,10 +1,22 @@
+import queue
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from src.profiler import profiler
+
+TELEGRAM_API = "https://api.telegram.org"
+TELEGRAM_MAX_CHARS = 4096
 
 class TelegramNotifier:
-    def __init__(self, token, chat_id):
+    def __init__(self, token, chat_id, session=None, api_url=TELEGRAM_API):
         self.token = token
         self.chat_id = chat_id
-        self.base_url = f"https://api.telegram.org/bot{self.token}/sendMessage"
+        self.base_url = f"{api_url}/bot{self.token}/sendMessage"
+        self.session = session or requests  # A shared Session reuses pooled HTTPS connections
 
     def send_alert(self, message):
         """Sends a real-time message to your Telegram app."""
@@ -14,8 +26,178 @@ class TelegramNotifier:
             "parse_mode": "Markdown"
         }
         try:
-            response = requests.post(self.base_url, data=payload)
+            with profiler.span("telegram", self.chat_id):
+                response = self.session.post(self.base_url, data=payload, timeout=10)
             return response.json()
         except Exception as e:
             print(f"Telegram Error: {e}")
-            return None
\ No newline at end of file
+            return None
+
+
+class AlertDispatcher:
+    """
+    Sends Telegram alerts from a background worker so the dashboard never waits on HTTPS.
+    - Bounded queue: submit() never blocks; alerts are dropped when the queue is full.
+    - Idempotency: an alert whose key (symbol, bar timestamp, signal) is queued or was delivered is
+      ignored. Keys are released when an alert is dropped or finally fails, so it can be resubmitted.
+    - Network errors are retried `max_attempts` times with exponential backoff.
+    - Rate limits: at most one message per chat per `chat_interval` s and `global_rate` msg/s
+      overall (Telegram's documented bot limits); alerts waiting for a chat are coalesced.
+    """
+
+    def __init__(self, token, api_url=TELEGRAM_API, max_queue=1000, chat_interval=1.0,
+                 global_rate=30, coalesce_max=20, dedup_size=10000, max_attempts=3, retry_delay=2.0):
+        self.token = token
+        self.api_url = api_url
+        self.chat_interval = chat_interval
+        self.global_interval = 1.0 / global_rate
+        self.coalesce_max = coalesce_max
+        self.dedup_size = dedup_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay  # First back-off after a network error, doubled per attempt
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=2)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._seen = OrderedDict()  # key -> True once delivered, False while queued
+        self._seen_lock = threading.Lock()
+        self._pending = defaultdict(deque)  # chat_id -> (message, key, attempts) waiting for a slot
+        self._next_slot = defaultdict(float)  # chat_id -> earliest monotonic time to send
+        self._last_send = 0.0
+        self._in_flight = 0
+        self._idle = threading.Condition()
+        self._stop = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="telegram-alerts", daemon=True)
+        self._worker.start()
+
+    def submit(self, chat_id, message, key=None):
+        """Queues an alert. Returns False if it was a duplicate or the queue is full."""
+        if key is not None:
+            with self._seen_lock:
+                if key in self._seen:
+                    return False
+                self._seen[key] = False
+                while len(self._seen) > self.dedup_size:
+                    self._seen.popitem(last=False)
+        with self._idle:
+            self._in_flight += 1
+        try:
+            self._queue.put_nowait((chat_id, message, key))
+        except queue.Full:
+            print(f"Telegram Error: alert queue full, dropping alert for chat {chat_id}")
+            self._release([key], delivered=False)
+            self._done(1)
+            return False
+        return True
+
+    def flush(self, timeout=None):
+        """Blocks until every queued alert has been sent (or dropped). Returns True if drained."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._in_flight == 0, timeout=timeout)
+
+    def close(self, timeout=5):
+        self.flush(timeout)
+        self._stop.set()
+        self._worker.join(timeout)
+        self.session.close()
+
+    def _release(self, keys, delivered):
+        """Marks keys as delivered (later duplicates ignored) or forgets them (resubmits allowed)."""
+        with self._seen_lock:
+            for key in keys:
+                if key is None:
+                    continue
+                if delivered:
+                    self._seen[key] = True
+                else:
+                    self._seen.pop(key, None)
+
+    def _done(self, count):
+        with self._idle:
+            self._in_flight -= count
+            self._idle.notify_all()
+
+    def _run(self):
+        while not self._stop.is_set():
+            # 1. Pull new alerts (wait briefly only when nothing is pending)
+            try:
+                block = not any(self._pending.values())
+                item = self._queue.get(timeout=0.2) if block else self._queue.get_nowait()
+                while True:
+                    self._pending[item[0]].append((item[1], item[2], 0))
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                pass
+
+            # 2. Send one coalesced message per chat whose rate-limit slot has opened
+            now = time.monotonic()
+            for chat_id, messages in list(self._pending.items()):
+                if not messages or now < self._next_slot[chat_id]:
+                    continue
+                wait = self._last_send + self.global_interval - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                batch = self._take_batch(messages)
+                self._send(chat_id, batch)
+                now = time.monotonic()
+
+            # 3. Sleep until the next chat becomes sendable
+            waiting = [self._next_slot[c] for c, m in self._pending.items() if m]
+            if waiting:
+                delay = min(waiting) - time.monotonic()
+                if delay > 0:
+                    self._stop.wait(min(delay, 0.2))
+
+    def _take_batch(self, messages):
+        """Pops as many messages as fit in one Telegram message."""
+        batch, size = [], 0
+        while messages and len(batch) < self.coalesce_max:
+            extra = len(messages[0][0]) + (2 if batch else 0)
+            if batch and size + extra > TELEGRAM_MAX_CHARS:
+                break
+            size += extra
+            batch.append(messages.popleft())
+        return batch
+
+    def _send(self, chat_id, batch):
+        notifier = TelegramNotifier(self.token, chat_id, session=self.session, api_url=self.api_url)
+        result = notifier.send_alert("\n\n".join(message for message, _, _ in batch))
+        self._last_send = time.monotonic()
+        self._next_slot[chat_id] = self._last_send + self.chat_interval
+
+        retry_after = ((result or {}).get("parameters") or {}).get("retry_after")
+        if retry_after:
+            # 429 Too Many Requests: put the batch back and respect Telegram's back-off
+            self._pending[chat_id].extendleft(reversed(batch))
+            self._next_slot[chat_id] = self._last_send + float(retry_after)
+            return
+        if result is None:
+            # Network error: retry with back-off, then give up and release the keys
+            retry = [(message, key, attempts + 1) for message, key, attempts in batch if attempts + 1 < self.max_attempts]
+            if retry:
+                self._pending[chat_id].extendleft(reversed(retry))
+                self._next_slot[chat_id] = self._last_send + self.retry_delay * 2 ** (retry[0][2] - 1)
+            failed = [key for _, key, attempts in batch if attempts + 1 >= self.max_attempts]
+            self._release(failed, delivered=False)
+            self._done(len(batch) - len(retry))
+            return
+        delivered = result.get("ok", False)
+        if not delivered:
+            print(f"Telegram Error: {result.get('description')}")
+        self._release([key for _, key, _ in batch], delivered=delivered)
+        self._done(len(batch))
+
+
+_dispatchers = {}
+_dispatchers_lock = threading.Lock()
+
+
+def get_dispatcher(token, **kwargs):
+    """One long-lived dispatcher per bot token, shared across Streamlit reruns."""
+    with _dispatchers_lock:
+        if token not in _dispatchers:
+            _dispatchers[token] = AlertDispatcher(token, **kwargs)
+        return _dispatchers[token]
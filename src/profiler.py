@@ -0,0 +1,257 @@
+import contextvars
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+
+class _NullSpan:
+    """Shared do-nothing span handed out while profiling is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("profiler", "run", "stage", "label", "start")
+
+    def __init__(self, profiler, run, stage, label):
+        self.profiler = profiler
+        self.run = run
+        self.stage = stage
+        self.label = label
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.run, self.stage, time.perf_counter() - self.start, self.label)
+        return False
+
+
+class _Run:
+    """Spans of one rerun; owned by the session (context) that opened it."""
+
+    __slots__ = ("enabled", "spans", "start")
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.spans = []  # (stage, label, seconds); list.append is atomic for worker threads
+        self.start = time.perf_counter()
+
+
+class StageProfiler:
+    """
+    Wall-clock spans for the stages of a dashboard rerun (fetch, indicators, signals, backtest, ...).
+    - span(stage, label) / @timed(stage): while disabled this is a context-variable lookup, no clock reads.
+    - begin_run(enabled) / end_run(): each Streamlit session opens its own run in a context variable,
+      so concurrent sessions never see or clear each other's spans. Worker threads join the run when
+      started with contextvars.copy_context() (DataLoader.fetch_many does this).
+    - Spans outside any run (the alert dispatcher thread, the scanner service) are kept per stage as
+      "<stage> (background)" while `enabled` is set, or while some session is timing its reruns:
+      during an enabled run and for `linger` seconds after it, so no session's switch stays on
+      for the whole process.
+    - Only the aggregate is shared: the last `history_size` reruns give rolling p50/p95 per stage,
+      exported as JSON or Prometheus text (to a file or over HTTP with serve()).
+    """
+
+    def __init__(self, enabled=False, history_size=200, linger=60.0):
+        self.enabled = enabled  # Always records spans outside begin_run/end_run (e.g. the scanner service)
+        self.linger = linger
+        self._open_runs = 0  # Enabled runs in progress, across sessions
+        self._timed_until = 0.0  # monotonic() until which background spans are still wanted
+        self.history = deque(maxlen=history_size)  # {stage: seconds} per finished rerun
+        self._run = contextvars.ContextVar("profiler_run", default=None)
+        self._lock = threading.Lock()
+        self._background = defaultdict(lambda: deque(maxlen=history_size))  # stage -> seconds per span
+        self._totals = defaultdict(lambda: [0.0, 0])  # stage -> [sum, count] over all samples
+        self._server = None
+
+    def _active(self):
+        """The run spans should go to, False when nothing should be recorded (None = background)."""
+        run = self._run.get()
+        if run is None:
+            wanted = self.enabled or self._open_runs > 0 or time.monotonic() < self._timed_until
+            return None if wanted else False
+        return run if run.enabled else False
+
+    def span(self, stage, label=None):
+        """Context manager timing one stage; `label` (e.g. a symbol) splits it in the breakdown."""
+        run = self._active()
+        if run is False:
+            return _NULL_SPAN
+        return _Span(self, run, stage, label)
+
+    def timed(self, stage):
+        """Decorator version of span() for whole functions."""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                run = self._active()
+                if run is False:
+                    return func(*args, **kwargs)
+                with _Span(self, run, stage, None):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, run, stage, seconds, label=None):
+        if run is not None:
+            run.spans.append((stage, label, seconds))
+            return
+        stage = f"{stage} (background)"
+        with self._lock:
+            self._background[stage].append(seconds)
+            self._totals[stage][0] += seconds
+            self._totals[stage][1] += 1
+
+    def begin_run(self, enabled=True):
+        """Opens a rerun for the calling context; `enabled` is this session's own switch."""
+        if enabled:
+            with self._lock:
+                self._open_runs += 1
+        self._run.set(_Run(enabled))
+
+    def end_run(self):
+        """
+        Closes the calling context's rerun and returns its spans as a DataFrame (Stage, Label,
+        Calls, Seconds), slowest first, with the rerun's wall time in .attrs['wall']. Only
+        enabled runs are added to the shared history.
+        """
+        run = self._run.get()
+        self._run.set(None)
+        wall = time.perf_counter() - run.start if run is not None else 0.0
+        if run is not None and run.enabled:
+            with self._lock:
+                self._open_runs -= 1
+                self._timed_until = time.monotonic() + self.linger
+        if run is None or not run.enabled:
+            return pd.DataFrame(columns=['Stage', 'Label', 'Calls', 'Seconds'])
+        spans = list(run.spans)
+
+        frame = pd.DataFrame(spans, columns=['Stage', 'Label', 'Seconds'])
+        frame['Label'] = frame['Label'].fillna('')
+        breakdown = (frame.groupby(['Stage', 'Label'], sort=False)['Seconds'].agg(['count', 'sum'])
+                     .reset_index().rename(columns={'count': 'Calls', 'sum': 'Seconds'}))
+        totals = frame.groupby('Stage', sort=False)['Seconds'].sum().to_dict()
+        totals['rerun'] = wall
+        with self._lock:
+            self.history.append(totals)
+            for stage, seconds in totals.items():
+                self._totals[stage][0] += seconds
+                self._totals[stage][1] += 1
+        breakdown = breakdown.sort_values('Seconds', ascending=False, ignore_index=True)
+        breakdown.attrs['wall'] = wall
+        return breakdown
+
+    def percentiles(self, quantiles=(0.5, 0.95)):
+        """
+        Rolling per-stage quantiles (seconds) of the per-rerun totals kept in the history;
+        background stages are summarised per span.
+        """
+        with self._lock:
+            history = list(self.history)
+            background = {stage: list(values) for stage, values in self._background.items()}
+        samples = defaultdict(list)
+        for run in history:
+            for stage, seconds in run.items():
+                samples[stage].append(seconds)
+        samples.update(background)
+        rows = {
+            stage: {**{f"p{round(q * 100)}": np.quantile(values, q) for q in quantiles},
+                    'last': values[-1], 'runs': len(values)}
+            for stage, values in samples.items()
+        }
+        return pd.DataFrame.from_dict(rows, orient='index').sort_values('last', ascending=False) if rows else pd.DataFrame()
+
+    def to_prometheus(self, prefix="dashboard_stage_seconds"):
+        """Prometheus text exposition: one summary per stage over the rolling rerun history."""
+        table = self.percentiles((0.5, 0.95))
+        lines = [f"# HELP {prefix} Seconds spent per stage in one dashboard rerun.", f"# TYPE {prefix} summary"]
+        with self._lock:
+            totals = {stage: tuple(value) for stage, value in self._totals.items()}
+        for stage, row in table.iterrows():
+            for q in ("0.5", "0.95"):
+                lines.append(f'{prefix}{{stage="{stage}",quantile="{q}"}} {row[f"p{round(float(q) * 100)}"]:.6f}')
+            lines.append(f'{prefix}_sum{{stage="{stage}"}} {totals[stage][0]:.6f}')
+            lines.append(f'{prefix}_count{{stage="{stage}"}} {totals[stage][1]}')
+        return "\n".join(lines) + "\n"
+
+    def to_json(self):
+        with self._lock:
+            history = list(self.history)
+        return json.dumps({'history': history, 'percentiles': self.percentiles().to_dict(orient='index')}, indent=2)
+
+    def export(self, path):
+        """Writes Prometheus text for a .prom/.txt path, JSON (history + percentiles) otherwise."""
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json()
+        with open(path, "w") as f:
+            f.write(text)
+
+    def serve(self, port, host="127.0.0.1"):
+        """
+        Serves to_prometheus() on http://host:port/metrics from a daemon thread (started once).
+        Returns None when the port cannot be bound (e.g. taken by another dashboard process);
+        the failure is logged once and not retried.
+        """
+        if self._server is not None:
+            return self._server or None
+        profiler = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = profiler.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            print(f"Metrics Server Error ({host}:{port}): {e}")
+            self._server = False
+            return None
+        threading.Thread(target=self._server.serve_forever, daemon=True, name="metrics-server").start()
+        return self._server
+
+    @contextmanager
+    def capture(self, top=40, sort="cumulative"):
+        """
+        cProfile of the enclosed block (calling thread only). Yields a dict whose 'text' holds
+        the top `top` functions once the block exits, so each session keeps its own report.
+        """
+        result = {'text': None}
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield result
+        finally:
+            profile.disable()
+            out = io.StringIO()
+            pstats.Stats(profile, stream=out).sort_stats(sort).print_stats(top)
+            result['text'] = out.getvalue()
+
+
+# Process-wide instance the pipeline modules report to; each dashboard session opens its own runs
+profiler = StageProfiler()
@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+from statistics import NormalDist
+
+from src.profiler import profiler
+
+
+class RiskManager:
+    """
+    Portfolio risk for the whole watchlist from a (time x symbol) table of log returns:
+    volatility/correlation-aware position sizing, historical & parametric VaR/CVaR and a
+    batched Monte Carlo of portfolio paths.
+    """
+
+    def __init__(self, returns, confidence=0.95, periods_per_year=252):
+        self.returns = returns.dropna(how='any')
+        self.symbols = list(self.returns.columns)
+        self.confidence = confidence
+        self.periods_per_year = periods_per_year
+        values = self.returns.to_numpy()
+        self.mean = values.mean(axis=0)
+        self.cov = np.atleast_2d(np.cov(values, rowvar=False)) if len(values) > 1 else np.zeros((len(self.symbols),) * 2)
+
+    @staticmethod
+    def stop_loss_position(capital, risk_pct, stop_loss_pct):
+        """Single-asset sizing: risk `risk_pct`% of capital with a stop `stop_loss_pct`% away."""
+        risk_amount = capital * (risk_pct / 100)
+        pos_size = risk_amount / (stop_loss_pct / 100)
+        return risk_amount, pos_size
+
+    def risk_parity_weights(self, iterations=100, tol=1e-8):
+        """
+        Equal-risk-contribution weights (sum to 1): each asset adds the same share of portfolio
+        variance under the full covariance, so assets that move together get less capital than
+        plain inverse volatility would give them, and hedges keep their share.
+        Newton's method on the convex log-barrier problem min ½yᵀCy - b·Σlog y (C = correlation,
+        b = 1/n), whose minimizer rescaled by 1/vol is the ERC portfolio; it also copes with
+        negative correlations. Falls back to inverse volatility when there is no ERC solution
+        (e.g. a zero-variance combination such as B = -A). Zero-volatility assets get no weight.
+        """
+        vol = np.sqrt(np.diag(self.cov))
+        live = vol > 0
+        weights = np.zeros(len(vol))
+        if not live.any():
+            return weights
+        weights[live] = self._erc(self.cov[np.ix_(live, live)], vol[live], iterations, tol)
+        return weights
+
+    @staticmethod
+    def _erc(cov, vol, iterations, tol):
+        inverse_vol = (1.0 / vol) / (1.0 / vol).sum()
+        corr = cov / np.outer(vol, vol)
+        b = 1.0 / len(vol)
+        y = np.full(len(vol), np.sqrt(b / max(corr.sum() / len(vol), 1e-12)))
+
+        def objective(y):
+            return 0.5 * y @ corr @ y - b * np.log(y).sum()
+
+        for _ in range(iterations):
+            grad = corr @ y - b / y
+            hessian = corr + np.diag(b / y ** 2)
+            try:
+                step = np.linalg.solve(hessian, grad)
+            except np.linalg.LinAlgError:
+                return inverse_vol
+            # 1. Damped step: stay inside y > 0 and never increase the objective
+            t, current = 1.0, objective(y)
+            while t > 1e-12 and (np.any(y - t * step <= 0) or objective(y - t * step) > current):
+                t *= 0.5
+            y = y - t * step
+            if not np.all(np.isfinite(y)):
+                return inverse_vol
+            # 2. Converged once every asset's share of the variance is 1/n
+            risk = y * (corr @ y)
+            if risk.sum() > 0 and np.abs(risk / risk.sum() - b).max() < tol:
+                w = y / vol
+                return w / w.sum()
+        return inverse_vol
+
+    def position_sizes(self, capital, target_vol=0.15, max_gross=1.0):
+        """
+        Equal-risk-contribution weights (see risk_parity_weights) scaled so the portfolio's
+        annualized volatility hits `target_vol`. Gross exposure is capped at `max_gross` x capital.
+        Returns a DataFrame per symbol.
+        """
+        vol = np.sqrt(np.diag(self.cov))
+        weights = self.risk_parity_weights()
+        port_vol = np.sqrt(weights @ self.cov @ weights * self.periods_per_year)
+        if port_vol > 0:
+            weights = weights * min(target_vol / port_vol, max_gross / weights.sum())
+        return pd.DataFrame({
+            'Weight': weights,
+            'Position ($)': weights * capital,
+            'Annual Vol': vol * np.sqrt(self.periods_per_year),
+        }, index=self.symbols)
+
+    def _portfolio_returns(self, weights):
+        """Simple portfolio returns from per-asset log returns (weights held fixed)."""
+        return np.expm1(self.returns.to_numpy()) @ np.asarray(weights)
+
+    def historical_var(self, weights, capital=1.0):
+        """One-period historical VaR and CVaR, returned as positive losses in capital units."""
+        pnl = self._portfolio_returns(weights) * capital
+        if len(pnl) == 0:
+            return 0.0, 0.0
+        cutoff = np.quantile(pnl, 1 - self.confidence)
+        tail = pnl[pnl <= cutoff]
+        return -cutoff, -tail.mean()
+
+    def parametric_var(self, weights, capital=1.0):
+        """One-period Gaussian (variance-covariance) VaR and CVaR as positive losses."""
+        weights = np.asarray(weights)
+        mu = weights @ self.mean
+        sigma = np.sqrt(weights @ self.cov @ weights)
+        normal = NormalDist()
+        z = normal.inv_cdf(1 - self.confidence)
+        var = -(mu + z * sigma)
+        cvar = -(mu - sigma * normal.pdf(z) / (1 - self.confidence))
+        return var * capital, cvar * capital
+
+    def monte_carlo(self, weights, capital=1.0, horizon=20, n_paths=50000, chunk_size=5000, seed=None):
+        """
+        Simulates `n_paths` correlated log-return paths over `horizon` periods, `chunk_size`
+        paths at a time so memory stays at chunk_size x horizon x n_assets floats.
+        Returns terminal VaR/CVaR, probability of loss and the average max drawdown.
+        """
+        weights = np.asarray(weights)
+        n_assets = len(weights)
+        rng = np.random.default_rng(seed)
+        # Cholesky of the covariance (tiny ridge keeps it positive-definite for duplicated assets)
+        chol = np.linalg.cholesky(self.cov + np.eye(n_assets) * 1e-12)
+        chol_t = chol.T.astype(np.float32)
+        mean = self.mean.astype(np.float32)
+        weights32 = weights.astype(np.float32)
+
+        terminal = np.empty(n_paths)
+        drawdowns = np.empty(n_paths)
+        for start in range(0, n_paths, chunk_size):
+            size = min(chunk_size, n_paths - start)
+            # float32 halves memory traffic; precision is far beyond the sampling error
+            shocks = rng.standard_normal((size, horizon, n_assets), dtype=np.float32) @ chol_t + mean
+            growth = np.exp(np.cumsum(shocks, axis=1))           # Per-asset value multipliers
+            value = capital * (1 + (growth - 1) @ weights32)     # Portfolio value per step
+            peak = np.maximum.accumulate(np.maximum(value, capital), axis=1)
+            terminal[start:start + size] = value[:, -1] - capital
+            drawdowns[start:start + size] = ((peak - value) / peak).max(axis=1)
+
+        cutoff = np.quantile(terminal, 1 - self.confidence)
+        return {
+            'VaR': -cutoff,
+            'CVaR': -terminal[terminal <= cutoff].mean(),
+            'Expected P&L': terminal.mean(),
+            'Prob. of Loss': (terminal < 0).mean(),
+            'Avg Max Drawdown': drawdowns.mean(),
+        }
+
+    @profiler.timed("risk")
+    def summary(self, capital, target_vol=0.15, horizon=20, n_paths=50000, seed=None):
+        """Sizing plus every risk measure for the whole book, in one call."""
+        sizes = self.position_sizes(capital, target_vol=target_vol)
+        weights = sizes['Weight'].to_numpy()
+        hist_var, hist_cvar = self.historical_var(weights, capital)
+        param_var, param_cvar = self.parametric_var(weights, capital)
+        return {
+            'positions': sizes,
+            'historical': {'VaR': hist_var, 'CVaR': hist_cvar},
+            'parametric': {'VaR': param_var, 'CVaR': param_cvar},
+            'monte_carlo': self.monte_carlo(weights, capital, horizon=horizon, n_paths=n_paths, seed=seed),
+        }
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.data_loader import DataLoader
+from src.profiler import profiler
+from src.strategy import TradingStrategy
+
+
+def _ewm(values, alpha, min_periods):
+    """
+    Column-wise ewm(adjust=False).mean() over a (time x symbol) array.
+    One Python step per bar, vectorized across every symbol; same recursion as pandas.
+    Columns may start late: leading NaNs are skipped and `min_periods` counts from each
+    column's first value (NaNs after that are not expected, see _right_align).
+    """
+    out = np.empty_like(values)
+    state = values[0].copy()
+    old_wt = 1.0 - alpha
+    for t in range(len(values)):
+        x = values[t]
+        if t:
+            moved = state != x
+            state = np.where(moved, (old_wt * state + alpha * x) / (old_wt + alpha), state)
+            state = np.where(np.isnan(state), x, state)  # Columns whose first value is this bar
+        out[t] = state
+    start = np.argmax(~np.isnan(values), axis=0)
+    out[np.arange(len(values))[:, None] < start + max(min_periods, 1) - 1] = np.nan
+    return out
+
+
+def _right_align(values):
+    """
+    Moves each column's bars to the bottom of the array, in order, with NaN padding on top:
+    a symbol's own series, as DataLoader would return it, ending on the last row. Any calendar
+    (late listings, exchange holidays, single missing bars) becomes a per-column start offset.
+    Returns (aligned, order) where aligned = values[order] column by column.
+    """
+    order = np.argsort(~np.isnan(values), axis=0, kind='stable')
+    return np.take_along_axis(values, order, axis=0), order
+
+
+def _rolling(values, window, reducer):
+    """
+    Column-wise rolling reduction (NaN until the window is full) without copying the data.
+    A window touching a column's leading NaNs reduces to NaN, so late starts need no special case.
+    """
+    out = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        out[window - 1:] = reducer(sliding_window_view(values, window, axis=0), axis=-1)
+    return out
+
+
+class PanelScanner:
+    """
+    Triple-confirmation scan of many symbols at once.
+    Takes a (time x symbol) Close panel and evaluates every column in the same NumPy pass.
+    """
+
+    def __init__(self, strategy=None):
+        self.strategy = strategy or TradingStrategy()
+
+    def indicators(self, close):
+        """
+        RSI, Bollinger Bands and MACD histogram for a 2-D array whose columns may start late
+        (leading NaNs); each column matches add_indicators on its own bars.
+        """
+        s = self.strategy
+
+        # 1. RSI (Wilder smoothing, first difference seeded with 0 like ta)
+        diff = np.vstack([np.full((1, close.shape[1]), np.nan), np.diff(close, axis=0)])
+        diff[np.isnan(diff) & ~np.isnan(close)] = 0.0
+        up = _ewm(np.where(diff < 0, 0.0, diff), 1 / s.rsi_period, s.rsi_period)
+        down = _ewm(np.where(diff > 0, 0.0, np.abs(diff)), 1 / s.rsi_period, s.rsi_period)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(down == 0, 100.0, 100 - (100 / (1 + up / down)))
+
+        # 2. Bollinger Bands (population std, like ta)
+        bb_mid = _rolling(close, s.bb_period, np.mean)
+        bb_std = _rolling(close, s.bb_period, np.std)
+
+        # 3. MACD 12/26/9 (ta defaults)
+        macd = _ewm(close, 2.0 / 13.0, 12) - _ewm(close, 2.0 / 27.0, 26)
+        macd_signal = _ewm(macd, 2.0 / 10.0, 9)  # Starts at each column's first MACD value
+
+        return {
+            'RSI': rsi,
+            'BB_High': bb_mid + s.bb_std * bb_std,
+            'BB_Low': bb_mid - s.bb_std * bb_std,
+            'MACD_Diff': macd - macd_signal,
+        }
+
+    @profiler.timed("scan")
+    def scan(self, panel):
+        """
+        Returns one row per symbol: Date, Price, RSI and Signal of its latest bar.
+        Every column is evaluated on its own bars (rows where it has no bar are skipped,
+        exactly like a per-symbol DataLoader frame) in a single pass over the panel.
+        """
+        panel = panel.astype(np.float64)
+        values = panel.to_numpy()
+        valid = ~np.isnan(values)
+        traded = valid.any(axis=0)
+        close, _ = _right_align(values[:, traded])
+        ind = self.indicators(close)
+        last = {name: series[-1] for name, series in ind.items()}
+        signal = TradingStrategy.signal_from_arrays(
+            close[-1], last['RSI'], last['BB_Low'], last['BB_High'], last['MACD_Diff']
+        )
+        # Last row with a bar, per symbol
+        last_row = len(values) - 1 - np.argmax(valid[::-1, traded], axis=0)
+
+        return pd.DataFrame({
+            'Date': panel.index[last_row],
+            'Price': close[-1],
+            'RSI': last['RSI'],
+            'Signal': signal.astype(np.int8),
+        }, index=panel.columns[traded])
+
+    @profiler.timed("signal_panel")
+    def signal_panel(self, panel):
+        """Full-history Signal for every symbol as a (time x symbol) int8 frame (0 where no bar)."""
+        values = panel.to_numpy(dtype=np.float64)
+        close, order = _right_align(values)
+        ind = self.indicators(close)
+        signal = TradingStrategy.signal_from_arrays(
+            close, ind['RSI'], ind['BB_Low'], ind['BB_High'], ind['MACD_Diff']
+        )
+        # Back to the panel's rows; padding rows have NaN inputs, so they carry signal 0
+        out = np.zeros(values.shape, dtype=np.int8)
+        np.put_along_axis(out, order, signal, axis=0)
+        return pd.DataFrame(out, index=panel.index, columns=panel.columns)
+
+    @staticmethod
+    def build_panel(symbols, period="1y", interval="1d", on_result=None):
+        """
+        Aligns each symbol's Close on the union of their timestamps (missing bars stay NaN).
+        Symbols are fetched concurrently; `on_result(symbol, df)` is called as each one lands.
+        """
+        closes = {}
+        for symbol, df in DataLoader.fetch_many(symbols, period=period, interval=interval):
+            if on_result is not None:
+                on_result(symbol, df)
+            if not df.empty:
+                closes[symbol] = df['Close'].squeeze()
+        # Keep watchlist order regardless of which download finished first
+        return pd.DataFrame({symbol: closes[symbol] for symbol in symbols if symbol in closes})
@@ -0,0 +1,228 @@
+import argparse
+import io
+import pathlib
+import signal as os_signal
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+import config
+from src.data_loader import DataLoader
+from src.data_store import period_start
+from src.notifier import get_dispatcher
+from src.scanner import PanelScanner
+from src.sentiment_analyzer import SentimentAnalyzer
+from src.strategy import TradingStrategy
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scan (
+    symbol TEXT, period TEXT, date TEXT, price REAL, rsi REAL, signal INTEGER, updated_at REAL,
+    PRIMARY KEY (symbol, period)
+);
+CREATE TABLE IF NOT EXISTS frames (
+    symbol TEXT, period TEXT, data BLOB, updated_at REAL,
+    PRIMARY KEY (symbol, period)
+);
+CREATE TABLE IF NOT EXISTS sentiment (
+    symbol TEXT PRIMARY KEY, score REAL, updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    started_at REAL, duration REAL, symbols INTEGER, status TEXT
+);
+"""
+
+
+def _oldest_first(period):
+    """Sort key by period start, with 'max' (no start) first."""
+    start = period_start(period)
+    return (start is not None, start or 0)
+
+
+class ScanStore:
+    """
+    SQLite snapshot written by the scanner service and only read by the dashboard.
+    WAL mode lets any number of dashboard sessions read while the service writes.
+    The service owns the schema and journal mode; readers open with readonly=True, which
+    never writes to the database (not even on open).
+    """
+
+    def __init__(self, path=config.SCANNER_DB, readonly=False):
+        self.path = path
+        self.readonly = readonly
+        if not readonly:
+            with self._connect() as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SCHEMA)
+
+    @classmethod
+    def open_readonly(cls, path=config.SCANNER_DB):
+        """Read-only store for the dashboard, or None until the service has created the database."""
+        return cls(path, readonly=True) if pathlib.Path(path).exists() else None
+
+    @contextmanager
+    def _connect(self):
+        """Connection that commits on success and is always closed."""
+        if self.readonly:
+            conn = sqlite3.connect(f"{pathlib.Path(self.path).resolve().as_uri()}?mode=ro", uri=True, timeout=10)
+        else:
+            conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def publish(self, period, scan, frames):
+        """Replaces the snapshot for one period in a single transaction."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO scan VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(symbol, period, str(row['Date']), float(row['Price']), float(row['RSI']), int(row['Signal']), now)
+                 for symbol, row in scan.iterrows()],
+            )
+            for symbol, df in frames.items():
+                buffer = io.BytesIO()
+                df.to_parquet(buffer)
+                conn.execute("INSERT OR REPLACE INTO frames VALUES (?, ?, ?, ?)",
+                             (symbol, period, buffer.getvalue(), now))
+
+    def publish_sentiment(self, scores):
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO sentiment VALUES (?, ?, ?)",
+                             [(symbol, float(score), now) for symbol, score in scores.items()])
+
+    def read_sentiment(self, symbol):
+        """Last published headline sentiment for a symbol, or None."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT score FROM sentiment WHERE symbol = ?", (symbol,)).fetchone()
+        return None if row is None else row[0]
+
+    def record_run(self, started_at, duration, symbols, status):
+        with self._connect() as conn:
+            conn.execute("INSERT INTO runs VALUES (?, ?, ?, ?)", (started_at, duration, symbols, status))
+
+    def last_update(self, period):
+        """Oldest publish time of a period's snapshot, or None (also while the schema is being created)."""
+        try:
+            with self._connect() as conn:
+                row = conn.execute("SELECT MIN(updated_at) FROM scan WHERE period = ?", (period,)).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return row[0]
+
+    def read_scan(self, symbols, period):
+        """Scan table (Date/Price/RSI/Signal per symbol) in watchlist order; empty if not published."""
+        with self._connect() as conn:
+            df = pd.read_sql_query(
+                f"SELECT symbol, date, price, rsi, signal FROM scan WHERE period = ? "
+                f"AND symbol IN ({','.join('?' * len(symbols))})",
+                conn, params=[period, *symbols],
+            )
+        df.columns = ['Symbol', 'Date', 'Price', 'RSI', 'Signal']
+        df = df.set_index('Symbol')
+        return df.reindex([s for s in symbols if s in df.index])
+
+    def read_frame(self, symbol, period):
+        """Published OHLCV + indicator + Signal frame for one symbol, or None."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT data FROM frames WHERE symbol = ? AND period = ?", (symbol, period)).fetchone()
+        return None if row is None else pd.read_parquet(io.BytesIO(row[0]))
+
+
+class ScannerService:
+    """
+    Refreshes the DataLoader -> TradingStrategy pipeline for a watchlist every `interval`
+    seconds and publishes the results to a ScanStore, independent of any dashboard session.
+    """
+
+    def __init__(self, watchlist, periods, interval, store=None, strategy=None):
+        self.watchlist = list(watchlist)
+        self.periods = list(periods)
+        self.interval = interval
+        self.store = store or ScanStore()
+        self.strategy = strategy or TradingStrategy()
+        self._stop = threading.Event()
+
+    def refresh(self):
+        """One full pass: fetch, indicators, signals and alerts for every period, then sentiment."""
+        scanner = PanelScanner(self.strategy)
+        # Longest period first: the OHLCV store then serves the shorter ones as slices
+        for period in sorted(self.periods, key=_oldest_first):
+            frames = {}
+            for symbol, df in DataLoader.fetch_many(self.watchlist, period=period):
+                if df.empty:
+                    continue
+                df = self.strategy.add_indicators(df)
+                frames[symbol] = self.strategy.generate_signals(df)
+            if not frames:
+                continue
+            panel = pd.DataFrame({symbol: df['Close'].squeeze() for symbol, df in frames.items()})
+            scan = scanner.scan(panel)
+            self.store.publish(period, scan, frames)
+            if period == self.periods[0]:
+                self._alert(scan)
+        self.store.publish_sentiment(SentimentAnalyzer.get_sentiment_many(self.watchlist))
+
+    def _alert(self, scan):
+        if not (config.TELEGRAM_TOKEN and config.TELEGRAM_CHAT_ID):
+            return
+        dispatcher = get_dispatcher(config.TELEGRAM_TOKEN)
+        for symbol, row in scan.iterrows():
+            label = {1: "🚀 *BUY ALERT*", -1: "🔻 *SELL ALERT*"}.get(int(row['Signal']))
+            if label:
+                dispatcher.submit(
+                    config.TELEGRAM_CHAT_ID,
+                    f"{label}: {symbol}\nPrice: ${row['Price']:,.2f}\nRSI: {row['RSI']:.1f}",
+                    key=(symbol, str(row['Date']), int(row['Signal'])),
+                )
+
+    def run_forever(self):
+        """Fixed-cadence scheduler: runs start every `interval` s, skipping any that are missed."""
+        next_run = time.monotonic()
+        while not self._stop.is_set():
+            started = time.time()
+            t0 = time.monotonic()
+            try:
+                self.refresh()
+                status = "ok"
+            except Exception as e:
+                status = f"error: {e}"
+                print(f"Scanner Error: {e}")
+            duration = time.monotonic() - t0
+            self.store.record_run(started, duration, len(self.watchlist), status)
+            print(f"Scan finished in {duration:.2f}s ({status})")
+
+            next_run += self.interval
+            if next_run < time.monotonic():
+                next_run = time.monotonic()  # Overran the cadence: start the next run right away
+            self._stop.wait(max(0.0, next_run - time.monotonic()))
+
+    def stop(self, *_):
+        self._stop.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless scanner that publishes results for the dashboard.")
+    parser.add_argument("--symbols", default=",".join(config.SCANNER_WATCHLIST))
+    parser.add_argument("--periods", default=",".join(config.SCANNER_PERIODS))
+    parser.add_argument("--interval", type=int, default=config.SCANNER_INTERVAL)
+    parser.add_argument("--db", default=config.SCANNER_DB)
+    parser.add_argument("--once", action="store_true", help="Run a single refresh and exit")
+    args = parser.parse_args()
+
+    service = ScannerService(args.symbols.split(","), args.periods.split(","), args.interval, store=ScanStore(args.db))
+    if args.once:
+        service.refresh()
+        return
+    os_signal.signal(os_signal.SIGINT, service.stop)
+    os_signal.signal(os_signal.SIGTERM, service.stop)
+    service.run_forever()
+
+
+if __name__ == "__main__":
+    main()
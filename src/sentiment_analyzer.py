@@ -1,30 +1,181 @@
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 from textblob import TextBlob
 import yfinance as yf
 
-class SentimentAnalyzer:
+from src.profiler import profiler
+
+
+def _score_titles(titles):
+    """TextBlob polarity for a batch of headlines (runs inside worker processes)."""
+    return [TextBlob(title).sentiment.polarity for title in titles]
+
+
+class HeadlineCache:
+    """
+    Headline -> polarity cache keyed by a content hash, with TTL + LRU eviction.
+    Pass `path` to persist scores to a JSON file between dashboard restarts: save_later()
+    writes it from a background thread at most every `save_interval` seconds, and pending
+    scores are flushed at interpreter exit.
+    """
+
+    def __init__(self, max_items=50000, ttl=7 * 24 * 3600, path=None, save_interval=60.0):
+        self.max_items = max_items
+        self.ttl = ttl
+        self.path = path
+        self.save_interval = save_interval
+        self._items = OrderedDict()  # hash -> (score, stored_at)
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # One writer of the JSON file at a time
+        self._dirty = False
+        self._saving = False
+        self._last_save = None  # monotonic() of the last write
+        if path:
+            atexit.register(self.save)
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self._items.update((k, tuple(v)) for k, v in json.load(f).items())
+            except (OSError, ValueError) as e:
+                print(f"Sentiment cache not loaded: {e}")
+
     @staticmethod
-    def get_sentiment(symbol):
-        """Analyzes news headlines safely using .get() to avoid KeyErrors."""
+    def key(title):
+        return hashlib.sha1(title.encode("utf-8")).hexdigest()
+
+    def get(self, title):
+        key = self.key(title)
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if time.time() - item[1] > self.ttl:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return item[0]
+
+    def put(self, title, score):
+        with self._lock:
+            self._items[self.key(title)] = (score, time.time())
+            self._items.move_to_end(self.key(title))
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+            self._dirty = True
+
+    def save(self):
+        """Writes the cache to `path` now (atomic replace); no-op without changes."""
+        with self._save_lock:
+            if not self.path or not self._dirty:
+                return
+            with self._lock:
+                snapshot = dict(self._items)
+                self._dirty = False
+                self._last_save = time.monotonic()
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp, self.path)
+
+    def save_later(self):
+        """Debounced save off the calling thread: at most one write per `save_interval` seconds."""
+        if not self.path or not self._dirty:
+            return
+        with self._lock:
+            recent = self._last_save is not None and time.monotonic() - self._last_save < self.save_interval
+            if self._saving or recent:
+                return
+            self._saving = True
+        threading.Thread(target=self._save_in_background, daemon=True, name="sentiment-cache-save").start()
+
+    def _save_in_background(self):
+        try:
+            self.save()
+        except OSError as e:
+            print(f"Sentiment cache not saved: {e}")
+        finally:
+            with self._lock:
+                self._saving = False
+
+
+class SentimentAnalyzer:
+    cache = HeadlineCache(path=os.getenv("SENTIMENT_CACHE_PATH"))
+    news_ttl = 300  # Seconds before a symbol's headline list is fetched again
+    process_threshold = 64  # Uncached headlines needed before scoring moves to a process pool
+    _news = {}  # symbol -> (titles, fetched_at)
+    _pool = None
+
+    @classmethod
+    def _titles(cls, symbol):
+        """Headline titles for a symbol, re-fetched at most every `news_ttl` seconds."""
+        cached = cls._news.get(symbol)
+        if cached and time.time() - cached[1] < cls.news_ttl:
+            return cached[0]
         ticker = yf.Ticker(symbol)
         try:
             news = ticker.news
         except Exception:
-            return 0.0 # Return neutral if API fails
-        
-        if not news:
-            return 0.0 
-        
-        scores = []
-        for item in news:
+            return []  # Treated as neutral if API fails
+
+        titles = []
+        for item in news or []:
             # Use .get('title') which returns None instead of crashing if 'title' is missing
             title = item.get('title')
-            
             if title:
-                analysis = TextBlob(title)
-                scores.append(analysis.sentiment.polarity)
-        
+                titles.append(title)
+        cls._news[symbol] = (titles, time.time())
+        return titles
+
+    @classmethod
+    def _score(cls, titles):
+        """Scores only headlines missing from the cache, in a process pool for large batches."""
+        missing = list(dict.fromkeys(t for t in titles if cls.cache.get(t) is None))
+        if missing:
+            if len(missing) >= cls.process_threshold:
+                if cls._pool is None:
+                    cls._pool = ProcessPoolExecutor()
+                chunk = max(1, len(missing) // (4 * (os.cpu_count() or 1)))
+                batches = [missing[i:i + chunk] for i in range(0, len(missing), chunk)]
+                scores = [s for batch in cls._pool.map(_score_titles, batches) for s in batch]
+            else:
+                scores = _score_titles(missing)
+            for title, score in zip(missing, scores):
+                cls.cache.put(title, score)
+            cls.cache.save_later()  # Never rewrite the JSON file on the render path
+        return {title: cls.cache.get(title) for title in titles}
+
+    @staticmethod
+    def _mean(titles, scores):
+        values = [scores[t] for t in titles if scores.get(t) is not None]
         # Avoid division by zero if no valid titles were found
-        if not scores:
-            return 0.0
-            
-        return sum(scores) / len(scores)
\ No newline at end of file
+        return sum(values) / len(values) if values else 0.0
+
+    @staticmethod
+    def get_sentiment(symbol):
+        """Average headline polarity for one symbol; already-seen headlines come from the cache."""
+        with profiler.span("sentiment", symbol):
+            titles = SentimentAnalyzer._titles(symbol)
+            if not titles:
+                return 0.0
+            return SentimentAnalyzer._mean(titles, SentimentAnalyzer._score(titles))
+
+    @staticmethod
+    def get_sentiment_many(symbols, max_workers=8):
+        """
+        Sentiment for a whole watchlist: news is fetched concurrently, then every
+        uncached headline is scored in one batch. Returns {symbol: score}.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(symbols))) as pool:
+            titles = dict(zip(symbols, pool.map(SentimentAnalyzer._titles, symbols)))
+        scores = SentimentAnalyzer._score([t for ts in titles.values() for t in ts])
+        return {symbol: SentimentAnalyzer._mean(ts, scores) for symbol, ts in titles.items()}
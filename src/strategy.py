@@ -1,7 +1,10 @@
+import numpy as np
 import pandas as pd
 from ta.momentum import RSIIndicator
 from ta.trend import SMAIndicator, MACD
 from ta.volatility import BollingerBands
+from src.indicators import IncrementalIndicators
+from src.profiler import profiler
 
 class TradingStrategy:
     def __init__(self, rsi_period=14, sma_fast=20, sma_slow=50, bb_period=20, bb_std=2):
@@ -10,7 +13,29 @@ class TradingStrategy:
         self.sma_slow = sma_slow
         self.bb_period = bb_period
         self.bb_std = bb_std
+        self._stream = None  # Live indicator state used by update()
 
+    def streaming_indicators(self):
+        """Fresh O(1)-per-bar indicator engine configured like add_indicators."""
+        return IncrementalIndicators(
+            rsi_period=self.rsi_period, sma_fast=self.sma_fast, sma_slow=self.sma_slow,
+            bb_period=self.bb_period, bb_std=self.bb_std,
+        )
+
+    def update(self, bar):
+        """
+        Live mode: feeds one new candle (a close price or a row with 'Close') into the
+        incremental indicators and returns the latest indicator values plus 'Signal'.
+        """
+        if self._stream is None:
+            self._stream = self.streaming_indicators()
+        values = self._stream.update(bar)
+        values['Signal'] = int(self.signal_from_arrays(
+            values['Close'], values['RSI'], values['BB_Low'], values['BB_High'], values['MACD_Diff']
+        ))
+        return values
+
+    @profiler.timed("indicators")
     def add_indicators(self, df):
         """Adds triple-confirmation indicators using the 'ta' library"""
         close_prices = df['Close'].squeeze()
@@ -36,14 +61,22 @@ class TradingStrategy:
         
         return df
 
-    def generate_signals(self, df):
+    @profiler.timed("signals")
+    def generate_signals(self, df, per_bar=False):
         """
         Triple Confirmation Logic:
         - BUY: RSI < 35 (Oversold), Price < BB_Low (Volatility limit), MACD turning Bullish
         - SELL: RSI > 65 (Overbought), Price > BB_High (Volatility limit), MACD turning Bearish
+        per_bar=True replays the frame through update() instead (indicator columns are
+        rebuilt from the streaming engine, which also leaves it warm for the next live bar).
         """
-        # Initialize the signal column
-        df['Signal'] = 0
+        if per_bar:
+            self._stream = None
+            rows = [self.update(close) for close in df['Close'].values.flatten()]
+            for column in ('RSI', 'SMA_Fast', 'SMA_Slow', 'MACD', 'MACD_Signal', 'MACD_Diff',
+                           'BB_High', 'BB_Low', 'BB_Mid', 'Signal'):
+                df[column] = [row[column] for row in rows]
+            return df
 
         # Extract underlying values to avoid index alignment issues
         # This converts Pandas columns into raw Numpy arrays for high-speed comparison
@@ -53,16 +86,19 @@ class TradingStrategy:
         bb_high = df['BB_High'].values.flatten()
         macd_diff = df['MACD_Diff'].values.flatten()
 
+        df['Signal'] = self.signal_from_arrays(close, rsi, bb_low, bb_high, macd_diff)
+        return df
+
+    @staticmethod
+    def signal_from_arrays(close, rsi, bb_low, bb_high, macd_diff):
+        """Triple-confirmation masks on raw arrays (any shape). Returns 1 / -1 / 0 as int8."""
         # --- BUY SIGNAL (Triple Confirmation) ---
         # Logic: RSI Oversold + Price at BB Floor + MACD turning up
         buy_mask = (rsi < 35) & (close <= bb_low) & (macd_diff > 0)
-        
-        # Now this will work because buy_mask is strictly 1D
-        df.loc[buy_mask, 'Signal'] = 1
-        
+
         # --- SELL SIGNAL (Triple Confirmation) ---
         # Logic: RSI Overbought + Price at BB Ceiling + MACD turning down
         sell_mask = (rsi > 65) & (close >= bb_high) & (macd_diff < 0)
-        df.loc[sell_mask, 'Signal'] = -1
-        
-        return df
\ No newline at end of file
+
+        # SELL is applied last, so it wins if both masks ever fire on the same bar
+        return np.where(sell_mask, -1, np.where(buy_mask, 1, 0)).astype(np.int8)
@@ -1,13 +1,63 @@
+from collections import OrderedDict
+
+import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from src.profiler import profiler
+
+# Line columns that are resampled as "last value of the bucket"
+LINE_COLUMNS = ['BB_High', 'BB_Low', 'SMA_Fast', 'SMA_Slow', 'RSI', 'MACD_Diff', 'MACD', 'MACD_Signal']
+
 class Visualizer:
+    _figure_cache = OrderedDict()  # Built figures keyed by (cache_key, data fingerprint)
+    max_cached_figures = 16
+
+    @staticmethod
+    def downsample(df, max_points):
+        """
+        Min/max bucket resampling to at most `max_points` candles.
+        Each bucket keeps its first Open, highest High, lowest Low, last Close and total Volume,
+        so no price extreme disappears from the chart; indicator lines keep their last value.
+        """
+        if len(df) <= max_points:
+            return df
+        buckets = np.arange(len(df)) * max_points // len(df)
+        grouped = df.groupby(buckets, sort=False)
+        agg = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+        agg.update({c: 'last' for c in LINE_COLUMNS if c in df.columns})
+        out = grouped.agg(agg)
+        # Label each bucket with its last timestamp (when the aggregated candle closed)
+        out.index = df.index[np.flatnonzero(np.diff(buckets, append=buckets[-1] + 1))]
+        return out
+
     @staticmethod
-    def plot_professional(df, symbol):
+    @profiler.timed("plot")
+    def plot_professional(df, symbol, max_points=2000, cache_key=None):
         """
         Generates a high-end interactive financial dashboard using Plotly.
         Includes Candlesticks, SMAs, Bollinger Bands, Volume, RSI, and MACD.
+        Frames longer than `max_points` bars are downsampled and drawn with WebGL traces, so the
+        browser payload stays roughly constant. Pass `cache_key` (e.g. symbol, period and strategy
+        parameters) to reuse the built figure until new bars arrive.
         """
+        if cache_key is not None:
+            # The last row is part of the key: a refreshed in-progress candle keeps length and timestamp
+            tail = tuple(df[['Open', 'High', 'Low', 'Close', 'Volume']].iloc[-1].values.flatten()) if len(df) else None
+            key = (cache_key, len(df), df.index[-1] if len(df) else None, tail, max_points)
+            cached = Visualizer._figure_cache.get(key)
+            if cached is not None:
+                Visualizer._figure_cache.move_to_end(key)
+                return cached
+
+        # Signal markers come from the full-resolution frame so none are lost to resampling
+        signal = df['Signal'].values.flatten()
+        buys = df[signal == 1]
+        sells = df[signal == -1]
+
+        large = len(df) > max_points
+        Line = go.Scattergl if large else go.Scatter  # WebGL for long series
+        df = Visualizer.downsample(df, max_points)
         
         # Industry standard color palette (TradingView Style)
         COLOR_UP = '#089981'        # Emerald Green
@@ -28,13 +78,13 @@ class Visualizer:
 
         # --- 1. PRIMARY CHART: Candlesticks & Overlays ---
         # Bollinger Bands Shading (Added as Scatter traces with 'tonexty' fill)
-        fig.add_trace(go.Scatter(
+        fig.add_trace(Line(
             x=df.index, y=df['BB_High'], 
             line=dict(color=COLOR_BB_FILL, width=0), 
             showlegend=False, hoverinfo='skip'
         ), row=1, col=1)
         
-        fig.add_trace(go.Scatter(
+        fig.add_trace(Line(
             x=df.index, y=df['BB_Low'], 
             fill='tonexty', fillcolor=COLOR_BB_FILL, 
             line=dict(color=COLOR_BB_FILL, width=0), 
@@ -49,32 +99,33 @@ class Visualizer:
         ), row=1, col=1)
 
         # SMAs
-        fig.add_trace(go.Scatter(x=df.index, y=df['SMA_Fast'], name="Fast SMA", line=dict(color=COLOR_SMA_FAST, width=1.5)), row=1, col=1)
-        fig.add_trace(go.Scatter(x=df.index, y=df['SMA_Slow'], name="Slow SMA", line=dict(color=COLOR_SMA_SLOW, width=1.5)), row=1, col=1)
+        fig.add_trace(Line(x=df.index, y=df['SMA_Fast'], name="Fast SMA", line=dict(color=COLOR_SMA_FAST, width=1.5)), row=1, col=1)
+        fig.add_trace(Line(x=df.index, y=df['SMA_Slow'], name="Slow SMA", line=dict(color=COLOR_SMA_SLOW, width=1.5)), row=1, col=1)
 
         # Execution Signals (Keep your markers)
-        buys = df[df['Signal'] == 1]
-        sells = df[df['Signal'] == -1]
         fig.add_trace(go.Scatter(x=buys.index, y=buys['Low']*0.98, mode='markers', name='BUY', marker=dict(symbol='triangle-up', size=14, color='#3fff00', line=dict(width=1, color='white'))), row=1, col=1)
         fig.add_trace(go.Scatter(x=sells.index, y=sells['High']*1.02, mode='markers', name='SELL', marker=dict(symbol='triangle-down', size=14, color='#ff0000', line=dict(width=1, color='white'))), row=1, col=1)
 
         # --- 2. VOLUME ---
-        vol_colors = [COLOR_UP if c >= o else COLOR_DOWN for o, c in zip(df['Open'], df['Close'])]
+        vol_colors = np.where(df['Close'].values.flatten() >= df['Open'].values.flatten(), COLOR_UP, COLOR_DOWN)
         fig.add_trace(go.Bar(x=df.index, y=df['Volume'], name="Volume", marker_color=vol_colors, opacity=0.6), row=2, col=1)
 
         # --- 3. RSI ---
-        fig.add_trace(go.Scatter(x=df.index, y=df['RSI'], name="RSI", line=dict(color=COLOR_RSI, width=2)), row=3, col=1)
+        fig.add_trace(Line(x=df.index, y=df['RSI'], name="RSI", line=dict(color=COLOR_RSI, width=2)), row=3, col=1)
         fig.add_hrect(y0=70, y1=100, fillcolor="red", opacity=0.1, line_width=0, row=3, col=1)
         fig.add_hrect(y0=0, y1=30, fillcolor="green", opacity=0.1, line_width=0, row=3, col=1)
 
         # --- 4. MACD HISTOGRAM ---
-        macd_colors = [COLOR_UP if val >= 0 else COLOR_DOWN for val in df['MACD_Diff']]
+        macd_colors = np.where(df['MACD_Diff'].values.flatten() >= 0, COLOR_UP, COLOR_DOWN)
         fig.add_trace(go.Bar(x=df.index, y=df['MACD_Diff'], name="MACD Hist", marker_color=macd_colors), row=4, col=1)
-        fig.add_trace(go.Scatter(x=df.index, y=df['MACD'], name="MACD Line", line=dict(color='white', width=1)), row=4, col=1)
-        fig.add_trace(go.Scatter(x=df.index, y=df['MACD_Signal'], name="Signal Line", line=dict(color='yellow', width=1)), row=4, col=1)
+        fig.add_trace(Line(x=df.index, y=df['MACD'], name="MACD Line", line=dict(color='white', width=1)), row=4, col=1)
+        fig.add_trace(Line(x=df.index, y=df['MACD_Signal'], name="Signal Line", line=dict(color='yellow', width=1)), row=4, col=1)
 
         # UI & LAYOUT
-        fig.update_xaxes(rangebreaks=[dict(bounds=["sat", "mon"])], gridcolor='#2D2E32', zeroline=False)
+        # plotly.js hides scattergl traces on axes with rangebreaks; resampled frames skip the gaps anyway
+        fig.update_xaxes(gridcolor='#2D2E32', zeroline=False)
+        if not large:
+            fig.update_xaxes(rangebreaks=[dict(bounds=["sat", "mon"])])
         fig.update_yaxes(gridcolor='#2D2E32', zeroline=False)
         fig.update_layout(
             template="plotly_dark", paper_bgcolor='#131722', plot_bgcolor='#131722',
@@ -83,5 +134,26 @@ class Visualizer:
             legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
             hovermode="x unified"
         )
-        
-        return fig
\ No newline at end of file
+
+        if cache_key is not None:
+            Visualizer._figure_cache[key] = fig
+            while len(Visualizer._figure_cache) > Visualizer.max_cached_figures:
+                Visualizer._figure_cache.popitem(last=False)
+        return fig
+
+    @staticmethod
+    def plot_correlation(corr, title="Portfolio Correlation Heatmap"):
+        """Interactive correlation heatmap (values annotated only while the matrix is small)."""
+        annotate = len(corr) <= 20
+        fig = go.Figure(go.Heatmap(
+            z=corr.values, x=list(corr.columns), y=list(corr.index),
+            colorscale='RdYlGn', zmin=-1, zmax=1, zmid=0,
+            text=np.round(corr.values, 2) if annotate else None,
+            texttemplate="%{text}" if annotate else None,
+            hovertemplate="%{y} / %{x}: %{z:.2f}<extra></extra>",
+        ))
+        fig.update_layout(
+            title=title, template="plotly_dark", paper_bgcolor='#131722', plot_bgcolor='#131722',
+            height=600, margin=dict(l=50, r=50, t=80, b=50), yaxis=dict(autorange="reversed"),
+        )
+        return fig
@@ -0,0 +1,9 @@
+import pytest
+
+from benchmarks.synthetic import synthetic_ohlcv
+
+
+@pytest.fixture(params=[0, 1, 2])
+def bars(request):
+    """Deterministic OHLCV frames, long enough for the triple-confirmation signal to trade ~10+ times."""
+    return synthetic_ohlcv(20_000, freq="minute", seed=request.param)
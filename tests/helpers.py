@@ -0,0 +1,7 @@
+from src.strategy import TradingStrategy
+
+
+def with_signals(df, strategy=None):
+    """Daily pipeline: ta indicators, then the vectorized triple-confirmation signal."""
+    strategy = strategy or TradingStrategy()
+    return strategy.generate_signals(strategy.add_indicators(df))
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from backtests.backtest import Backtester
+from tests.helpers import with_signals
+
+
+def assert_engines_match(df):
+    balance, ret, trades = Backtester(10000).run(df, engine="loop")
+    v_balance, v_ret, v_trades, equity, trade_log = Backtester(10000).run_vectorized(df)
+
+    assert v_trades == trades == len(trade_log)
+    assert v_balance == pytest.approx(balance, rel=1e-12)
+    assert v_ret == pytest.approx(ret, rel=1e-9, abs=1e-9)
+    assert len(equity) == len(df.dropna())
+    assert equity.iloc[-1] == pytest.approx(v_balance, rel=1e-12)
+    return trades
+
+
+def test_vectorized_matches_loop(bars):
+    assert assert_engines_match(with_signals(bars)) > 0
+
+
+def test_vectorized_matches_loop_on_dense_signals(bars):
+    # Random buy/sell/hold on every bar: repeated signals and back-to-back flips
+    df = bars.copy()
+    df['Signal'] = np.random.default_rng(7).integers(-1, 2, len(df)).astype(np.int8)
+    assert assert_engines_match(df) > 1000
+
+
+def test_engine_switch(bars):
+    df = with_signals(bars)
+    assert Backtester(10000).run(df, engine="vectorized") == Backtester(10000).run_vectorized(df)[:3]
+    with pytest.raises(ValueError):
+        Backtester(10000).run(df, engine="numba")
+
+
+def test_no_signals_keeps_capital(bars):
+    df = bars.copy()
+    df['Signal'] = np.int8(0)
+    assert Backtester(10000).run(df) == (10000, 0.0, 0)
+    assert Backtester(10000).run_vectorized(df)[:3] == (10000, 0.0, 0)
@@ -0,0 +1,37 @@
+import pytest
+
+from benchmarks.run_benchmarks import compare, merge_rounds
+
+
+def row(seconds, noise=0.0, stage="add_indicators"):
+    return {"stage": stage, "freq": "daily", "bars": 1000, "symbols": 1, "seconds": seconds, "noise": noise}
+
+
+def test_quiet_stage_is_held_to_the_threshold():
+    baseline = {"results": [row(0.100, noise=0.01)]}
+    assert compare([row(0.125, noise=0.01)], baseline, threshold=1.3, min_delta=0.002) == []
+    regressions = compare([row(0.140, noise=0.01)], baseline, threshold=1.3, min_delta=0.002)
+    assert [r["ratio"] for r in regressions] == [pytest.approx(1.4)]
+
+
+def test_noisy_stage_gets_a_wider_limit():
+    baseline = {"results": [row(0.100, noise=0.10)]}
+    # 1 + 3 x (0.10 + 0.05) = 1.45x allowed
+    assert compare([row(0.140, noise=0.05)], baseline, threshold=1.3, min_delta=0.002) == []
+    assert len(compare([row(0.150, noise=0.05)], baseline, threshold=1.3, min_delta=0.002)) == 1
+
+
+def test_tiny_absolute_slowdowns_are_ignored():
+    baseline = {"results": [row(0.001)]}
+    assert compare([row(0.0025)], baseline, threshold=1.3, min_delta=0.002) == []
+
+
+def test_baselines_without_noise_still_compare():
+    baseline = {"results": [{k: v for k, v in row(0.100).items() if k != "noise"}]}
+    assert len(compare([row(0.200)], baseline, threshold=1.3, min_delta=0.002)) == 1
+
+
+def test_merge_rounds_takes_median_and_drift():
+    merged = merge_rounds([[row(0.100, 0.01)], [row(0.120, 0.02)], [row(0.110, 0.01)]])
+    assert merged[0]["seconds"] == 0.110
+    assert merged[0]["noise"] == pytest.approx(0.01 / 0.110)  # (max - min) / 2, relative
@@ -0,0 +1,108 @@
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import synthetic_ohlcv
+from src.data_store import OHLCVStore, period_start
+
+
+class StubFetcher:
+    """Offline stand-in for yf.download: serves slices of a fixed history and records every call."""
+
+    def __init__(self, years=12):
+        today = pd.Timestamp.now().normalize()
+        n_bars = years * 365
+        self.market = synthetic_ohlcv(n_bars, start=today - pd.Timedelta(days=n_bars - 1))
+        self.market.index = pd.date_range(end=today, periods=n_bars, freq="D")
+        self.calls = []
+
+    def __call__(self, ticker, interval, start=None, period=None):
+        self.calls.append({'start': start, 'period': period})
+        if ticker == "DELISTED":
+            return pd.DataFrame()
+        since = start if start is not None else period_start(period)
+        return self.market if since is None else self.market[self.market.index >= since]
+
+
+@pytest.fixture
+def fetcher():
+    return StubFetcher()
+
+
+def make_store(tmp_path, fetcher, **kwargs):
+    return OHLCVStore(root=str(tmp_path), fetcher=fetcher, retries=0, backoff=0, **kwargs)
+
+
+def test_warm_repeat_only_requests_new_bars(tmp_path, fetcher):
+    store = make_store(tmp_path, fetcher, refresh_seconds=0)
+    first = store.get("AAA", period="1y")
+    second = store.get("AAA", period="1y")
+
+    assert fetcher.calls[0] == {'start': None, 'period': '1y'}
+    assert fetcher.calls[1] == {'start': first.index[-1], 'period': None}
+    pd.testing.assert_frame_equal(first, second, check_freq=False)
+
+
+def test_repeat_within_refresh_window_is_served_from_memory(tmp_path, fetcher):
+    store = make_store(tmp_path, fetcher, refresh_seconds=3600)
+    store.get("AAA", period="1y")
+    store.get("AAA", period="6mo")
+    assert len(fetcher.calls) == 1
+
+
+def test_longer_period_fetches_once_and_merges_without_duplicates(tmp_path, fetcher):
+    store = make_store(tmp_path, fetcher, refresh_seconds=3600)
+    store.get("AAA", period="1y")
+    longer = store.get("AAA", period="5y")
+
+    assert [call['period'] for call in fetcher.calls] == ['1y', '5y']
+    assert longer.index.is_unique and longer.index.is_monotonic_increasing
+    expected = fetcher.market[fetcher.market.index >= longer.index[0]]
+    pd.testing.assert_frame_equal(longer, expected, check_freq=False)
+    # The wider window is now stored: shorter and equal periods cost no download
+    store.get("AAA", period="2y")
+    store.get("AAA", period="5y")
+    assert len(fetcher.calls) == 2
+
+
+def test_max_covers_every_period(tmp_path, fetcher):
+    store = make_store(tmp_path, fetcher, refresh_seconds=3600)
+    full = store.get("AAA", period="max")
+    for period in ("1mo", "1y", "10y", "ytd", "max"):
+        assert not store.get("AAA", period=period).empty
+    assert len(fetcher.calls) == 1
+    assert len(full) == len(fetcher.market)
+
+    # Also after a restart: the Parquet file and its index entry still cover 10y, so the
+    # (possibly stale) file is only topped up from its last bar
+    make_store(tmp_path, fetcher, refresh_seconds=3600).get("AAA", period="10y")
+    assert fetcher.calls[1] == {'start': full.index[-1], 'period': None}
+
+
+def test_revised_last_bar_replaces_stored_one(tmp_path, fetcher):
+    store = make_store(tmp_path, fetcher, refresh_seconds=0)
+    before = store.get("AAA", period="1y")
+    fetcher.market.iloc[-1, fetcher.market.columns.get_loc('Close')] += 1.0  # Candle still forming
+
+    after = store.get("AAA", period="1y")
+    assert len(after) == len(before)
+    assert after['Close'].iloc[-1] == before['Close'].iloc[-1] + 1.0
+    assert after.index.is_unique
+
+
+def test_evicted_keys_reload_from_disk(tmp_path, fetcher):
+    store = make_store(tmp_path, fetcher, max_items=1, refresh_seconds=3600)
+    store.get("AAA", period="1y")
+    store.get("BBB", period="1y")  # Evicts AAA from the in-memory LRU
+    assert list(store._cache) == [("BBB", "1d")]
+
+    reloaded = store.get("AAA", period="6mo")
+    # AAA came back from Parquet: topped up from its last bar, not downloaded again
+    assert fetcher.calls[2] == {'start': reloaded.index[-1], 'period': None}
+    assert len(fetcher.calls) == 3
+
+
+def test_empty_cold_download_is_not_repeated(tmp_path, fetcher):
+    store = make_store(tmp_path, fetcher, empty_ttl=300)
+    assert store.get("DELISTED", period="1y").empty
+    assert store.get("DELISTED", period="1y").empty
+    assert len(fetcher.calls) == 1
@@ -0,0 +1,69 @@
+import asyncio
+
+from src.executor import ExecutionEngine, SimulatedExchange
+
+
+class FailingPolls(SimulatedExchange):
+    """Accepts orders but every fetch_order fails, e.g. a dropped connection after the ack."""
+
+    async def fetch_order(self, id, symbol=None, params=None):
+        raise ConnectionError("socket closed")
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def submit_one(exchange, **kwargs):
+    engine = ExecutionEngine({'sim': exchange}, rate_limits={'sim': 1000}, poll_interval=0.05, **kwargs)
+    try:
+        return await engine.submit('sim', 'BTC/USDT', 'buy', 0.5)
+    finally:
+        await engine.close()
+
+
+def test_fill_latency_comes_from_exchange_trades():
+    # Polling every 50 ms must not inflate a 10 ms fill
+    exchange = SimulatedExchange({'BTC/USDT': 100.0}, ack_latency=0.001, fill_latency=0.01)
+    record = run(submit_one(exchange))
+    assert record['status'] == 'closed'
+    assert record['ack'] <= record['first_fill'] <= record['fill']
+    assert record['fill'] - record['ack'] < 0.04
+
+
+def test_failed_poll_cancels_the_resting_order():
+    exchange = FailingPolls({'BTC/USDT': 100.0}, ack_latency=0.001, fill_latency=10.0)
+    record = run(submit_one(exchange))
+    assert record['status'] == 'canceled'
+    assert exchange.orders[record['id']]['status'] == 'canceled'
+
+
+def test_timeout_cancels_unfilled_limit_order():
+    async def limit_far_from_market():
+        exchange = SimulatedExchange({'BTC/USDT': 100.0}, ack_latency=0.001, fill_latency=0.01)
+        engine = ExecutionEngine({'sim': exchange}, rate_limits={'sim': 1000}, poll_interval=0.01, fill_timeout=0.05)
+        try:
+            return await engine.submit('sim', 'BTC/USDT', 'buy', 0.5, type='limit', price=50.0), exchange
+        finally:
+            await engine.close()
+
+    record, exchange = run(limit_far_from_market())
+    assert record['status'] == 'canceled'
+    assert record['fill'] is None
+    assert exchange.orders[record['id']]['status'] == 'canceled'
+
+
+def test_latency_report_stages():
+    async def batch():
+        exchange = SimulatedExchange({'BTC/USDT': 100.0}, ack_latency=0.001, fill_latency=0.005)
+        engine = ExecutionEngine({'sim': exchange}, rate_limits={'sim': 1000}, poll_interval=0.01)
+        try:
+            await engine.submit_many([{'exchange': 'sim', 'symbol': 'BTC/USDT', 'side': 'buy', 'amount': 0.2}] * 20)
+        finally:
+            await engine.close()
+        return engine.latency_report()
+
+    report = run(batch())
+    assert list(report.index) == ['queue', 'submit->ack', 'ack->first fill', 'ack->fill', 'submit->fill']
+    assert report.loc['ack->fill', 'count'] == 20
+    assert report.attrs['throughput (orders/s)'] > 0
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from src.indicators import IncrementalIndicators
+from src.strategy import TradingStrategy
+
+COLUMNS = ['RSI', 'SMA_Fast', 'SMA_Slow', 'MACD', 'MACD_Signal', 'MACD_Diff', 'BB_High', 'BB_Low', 'BB_Mid']
+
+
+def test_per_bar_matches_ta(bars):
+    strategy = TradingStrategy()
+    expected = strategy.generate_signals(strategy.add_indicators(bars.copy()))
+    streamed = strategy.generate_signals(bars.copy(), per_bar=True)
+
+    for column in COLUMNS:
+        a, b = expected[column].to_numpy(), streamed[column].to_numpy()
+        assert np.array_equal(np.isnan(a), np.isnan(b)), column
+        # EMA-based columns replay pandas' recursion exactly; rolling windows stay at rounding level
+        np.testing.assert_allclose(b, a, rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=column)
+    np.testing.assert_array_equal(streamed['Signal'], expected['Signal'])
+
+
+def test_update_accepts_numpy_and_mapping_bars(bars):
+    closes = bars['Close'].to_numpy()
+    reference = IncrementalIndicators()
+    for close in closes[:100]:
+        expected = reference.update(float(close))
+
+    for feed in (np.float32, np.float64, np.int64, lambda c: np.array([c]), lambda c: {'Close': c}):
+        engine = IncrementalIndicators()
+        for close in closes[:100]:
+            values = engine.update(feed(close))
+        if feed in (np.float32, np.int64):
+            assert values['Close'] == pytest.approx(float(feed(closes[99])))
+        else:
+            assert values == pytest.approx(expected, nan_ok=True)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from backtests.backtest import Backtester
+from src.intraday import ChunkedIndicators, CompactOHLCV, signal_chunks, stream_signals
+from src.strategy import TradingStrategy
+from tests.helpers import with_signals
+
+
+@pytest.mark.parametrize("chunk_size", [997, 5000, 50_000])
+def test_run_stream_matches_run_vectorized(bars, chunk_size):
+    compact = CompactOHLCV.from_frame(bars)
+    # The stream reads float32 prices, so the reference runs on the same rounded frame
+    balance, ret, trades, equity, trade_log = Backtester(10000).run_vectorized(with_signals(compact.to_frame()))
+    s_balance, s_ret, s_trades, s_equity, s_log = Backtester(10000).run_stream(
+        signal_chunks(compact, chunk_size=chunk_size)
+    )
+
+    assert trades > 0
+    assert s_trades == trades
+    assert s_balance == pytest.approx(balance, rel=1e-9)
+    assert s_ret == pytest.approx(ret, rel=1e-7, abs=1e-7)
+    assert s_equity.index.equals(equity.index)
+    np.testing.assert_allclose(s_equity.to_numpy(), equity.to_numpy(), rtol=1e-6)
+    assert s_log.index.equals(trade_log.index)
+    assert list(s_log['Side']) == list(trade_log['Side'])
+
+
+def test_chunked_indicators_match_ta(bars):
+    compact = CompactOHLCV.from_frame(bars)
+    strategy = TradingStrategy()
+    expected = strategy.add_indicators(compact.to_frame())
+    chunks = list(stream_signals(compact, chunk_size=997))
+    warmup = ChunkedIndicators().warmup
+
+    for column in ('RSI', 'BB_High', 'BB_Low', 'MACD_Diff'):
+        streamed = np.concatenate([ind[column] for _, _, ind, _ in chunks])
+        np.testing.assert_allclose(streamed[warmup:], expected[column].to_numpy()[warmup:], rtol=1e-6, err_msg=column)
+    # warmup is exactly the prefix the daily backtest drops with dropna()
+    assert expected.dropna().index[0] == expected.index[warmup]
+
+
+def test_keep_equity_false(bars):
+    compact = CompactOHLCV.from_frame(bars)
+    full = Backtester(10000).run_stream(signal_chunks(compact, chunk_size=5000))
+    lean = Backtester(10000).run_stream(signal_chunks(compact, chunk_size=5000), keep_equity=False)
+    assert lean[3] is None
+    assert lean[:3] == full[:3]
@@ -0,0 +1,126 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+from src.notifier import AlertDispatcher
+
+
+class StubTelegram:
+    """Local stand-in for the Bot API: records every sendMessage and replies from a script."""
+
+    def __init__(self):
+        self.requests = []  # (monotonic time, chat_id, text)
+        self.replies = []  # Queued (status, body) overrides; {"ok": true} once empty
+        self.failing_chats = set()  # Chats answered with a non-JSON 502 (a network-level failure)
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                form = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+                chat_id, text = form["chat_id"][0], form["text"][0]
+                stub.requests.append((time.monotonic(), chat_id, text))
+                if chat_id in stub.failing_chats:
+                    status, body = 502, b"<html>Bad Gateway</html>"
+                elif stub.replies:
+                    status, reply = stub.replies.pop(0)
+                    body = json.dumps(reply).encode()
+                else:
+                    status, body = 200, json.dumps({"ok": True}).encode()
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def texts(self, chat_id):
+        return [text for _, chat, text in self.requests if chat == chat_id]
+
+
+@pytest.fixture
+def telegram():
+    stub = StubTelegram()
+    yield stub
+    stub.server.shutdown()
+
+
+@pytest.fixture
+def make_dispatcher(telegram):
+    dispatchers = []
+
+    def make(**kwargs):
+        dispatcher = AlertDispatcher("TOKEN", api_url=telegram.url, **kwargs)
+        dispatchers.append(dispatcher)
+        return dispatcher
+
+    yield make
+    for dispatcher in dispatchers:
+        dispatcher.close()
+
+
+def test_duplicate_keys_are_sent_once(telegram, make_dispatcher):
+    dispatcher = make_dispatcher()
+    assert dispatcher.submit("1", "BUY AAA", key=("AAA", "2024-01-02", 1))
+    assert not dispatcher.submit("1", "BUY AAA", key=("AAA", "2024-01-02", 1))  # Still queued
+    assert dispatcher.flush(5)
+    assert not dispatcher.submit("1", "BUY AAA", key=("AAA", "2024-01-02", 1))  # Delivered
+    assert dispatcher.flush(5)
+    assert telegram.texts("1") == ["BUY AAA"]
+
+
+def test_alerts_waiting_for_a_chat_are_coalesced(telegram, make_dispatcher):
+    dispatcher = make_dispatcher(chat_interval=0.5)
+    for i in range(5):
+        dispatcher.submit("1", f"alert {i}", key=i)
+    assert dispatcher.flush(5)
+
+    sent = telegram.texts("1")
+    assert len(sent) <= 2  # The first may go alone; the rest share the next slot
+    assert "\n\n".join(sent).split("\n\n") == [f"alert {i}" for i in range(5)]
+
+
+def test_messages_to_one_chat_are_spaced(telegram, make_dispatcher):
+    dispatcher = make_dispatcher(chat_interval=0.3)
+    dispatcher.submit("1", "first", key="a")
+    assert dispatcher.flush(5)
+    dispatcher.submit("1", "second", key="b")
+    dispatcher.submit("2", "other chat", key="c")
+    assert dispatcher.flush(5)
+
+    times = {text: at for at, _, text in telegram.requests}
+    assert times["second"] - times["first"] >= 0.3
+    assert times["other chat"] - times["first"] < 0.3  # Another chat has its own slot
+
+
+def test_retry_after_is_respected(telegram, make_dispatcher):
+    telegram.replies.append((429, {"ok": False, "error_code": 429, "parameters": {"retry_after": 0.4}}))
+    dispatcher = make_dispatcher(chat_interval=0.0)
+    dispatcher.submit("1", "BUY AAA", key="a")
+    assert dispatcher.flush(5)
+
+    (first, _, _), (second, _, text) = telegram.requests
+    assert text == "BUY AAA"
+    assert second - first >= 0.4
+
+
+def test_key_is_released_after_final_failure(telegram, make_dispatcher):
+    telegram.failing_chats.add("1")
+    dispatcher = make_dispatcher(chat_interval=0.0, max_attempts=2, retry_delay=0.05)
+    assert dispatcher.submit("1", "BUY AAA", key="a")
+    assert dispatcher.flush(5)
+    assert len(telegram.texts("1")) == 2  # One retry, then give up
+
+    telegram.failing_chats.clear()
+    assert dispatcher.submit("1", "BUY AAA", key="a")  # Released, so it can be resubmitted
+    assert dispatcher.flush(5)
+    assert telegram.texts("1")[-1] == "BUY AAA"
+    assert not dispatcher.submit("1", "BUY AAA", key="a")
@@ -0,0 +1,35 @@
+import pytest
+
+from backtests.backtest import Backtester
+from backtests.optimizer import PARAM_NAMES, ParameterOptimizer
+from src.strategy import TradingStrategy
+from tests.helpers import with_signals
+
+SPACE = dict(rsi_period=[7, 14], sma_slow=[30, 50], bb_period=[10, 20], bb_std=[1.5, 2])
+
+
+def full_pipeline(df, params):
+    """Reference result: fresh indicators -> signals -> backtest for one parameter set."""
+    # run_vectorized is pinned to the loop engine in test_backtest; it keeps this test fast
+    return Backtester(10000).run_vectorized(with_signals(df.copy(), TradingStrategy(**params)))[:3]
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_optimizer_matches_full_pipeline(bars, max_workers):
+    param_sets = ParameterOptimizer.grid(**SPACE)
+    results = ParameterOptimizer(bars, 10000, max_workers=max_workers).run(param_sets)
+
+    assert len(results) == len(param_sets)
+    assert results["Trades"].sum() > 0
+    for row in results.to_dict(orient="records"):
+        params = {name: row[name] for name in PARAM_NAMES}
+        balance, ret, trades = full_pipeline(bars, params)
+        assert row["Trades"] == trades
+        assert row["Final Balance"] == pytest.approx(balance, rel=1e-12)
+        assert row["Return (%)"] == pytest.approx(ret, rel=1e-9, abs=1e-9)
+
+
+def test_results_are_ranked(bars):
+    results = ParameterOptimizer(bars, 10000, max_workers=1).run(ParameterOptimizer.grid(**SPACE))
+    assert list(results["Rank"]) == list(range(1, len(results) + 1))
+    assert results["Return (%)"].is_monotonic_decreasing
@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+
+from backtests.portfolio import PortfolioBacktester
+
+
+def test_sizing_vol_uses_each_symbols_own_bars():
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2023-01-01", periods=300, freq="D")
+    close = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.02, (300, 4)), axis=0)),
+                         index=index, columns=["BTC-USD", "AAPL", "MSFT", "NEW"])
+    close.iloc[index.dayofweek >= 5, 1:3] = np.nan  # Equities skip weekends
+    close.iloc[:120, 3] = np.nan  # Listed later
+
+    backtester = PortfolioBacktester()
+    vol = backtester.own_bar_vol(close)
+    for j, symbol in enumerate(close.columns):
+        own = np.log(close[symbol].dropna()).diff().rolling(backtester.vol_window, min_periods=2).std()
+        expected = own.reindex(close.index).ffill().to_numpy()
+        np.testing.assert_allclose(vol[:, j], expected, rtol=1e-12, equal_nan=True, err_msg=symbol)
+    # Monday returns count: equities have a volatility on every weekday past the warm-up
+    assert not np.isnan(vol[30:, 1]).any()
@@ -0,0 +1,54 @@
+import contextvars
+import socket
+import threading
+
+from src.profiler import StageProfiler
+
+
+def background_span(profiler, stage="alerts"):
+    """A span from a thread outside any session's context, like the alert dispatcher."""
+    thread = threading.Thread(target=lambda: profiler.span(stage).__enter__().__exit__(None, None, None))
+    thread.start()
+    thread.join()
+
+
+def test_sessions_keep_their_own_runs():
+    profiler = StageProfiler()
+    a, b = contextvars.copy_context(), contextvars.copy_context()
+    a.run(profiler.begin_run, True)
+    b.run(profiler.begin_run, False)
+    a.run(lambda: profiler.span("fetch", "AAA").__enter__().__exit__(None, None, None))
+    b.run(lambda: profiler.span("fetch", "BBB").__enter__().__exit__(None, None, None))
+
+    breakdown = a.run(profiler.end_run)
+    assert list(breakdown['Label']) == ['AAA']
+    assert b.run(profiler.end_run).empty
+    assert len(profiler.history) == 1
+
+
+def test_background_timing_follows_timed_sessions():
+    profiler = StageProfiler(linger=0.0)
+    background_span(profiler)
+    assert "alerts (background)" not in profiler.percentiles().index
+
+    session = contextvars.copy_context()
+    session.run(profiler.begin_run, True)
+    background_span(profiler)
+    session.run(profiler.end_run)
+    assert profiler.percentiles().loc["alerts (background)", "runs"] == 1
+
+    # The session stopped timing: nothing keeps the process-wide switch on
+    session.run(profiler.begin_run, False)
+    background_span(profiler)
+    session.run(profiler.end_run)
+    assert profiler.percentiles().loc["alerts (background)", "runs"] == 1
+
+
+def test_serve_survives_a_taken_port():
+    with socket.socket() as taken:
+        taken.bind(("127.0.0.1", 0))
+        taken.listen()
+        port = taken.getsockname()[1]
+        profiler = StageProfiler()
+        assert profiler.serve(port) is None
+        assert profiler.serve(port) is None  # Remembered, not retried on every rerun
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.risk_manager import RiskManager
+
+
+def returns(**columns):
+    return pd.DataFrame(columns)
+
+
+def risk_shares(manager, weights):
+    contribution = weights * (manager.cov @ weights)
+    return contribution / contribution.sum()
+
+
+@pytest.fixture
+def legs():
+    rng = np.random.default_rng(0)
+    return rng.normal(0, 0.02, 500), rng.normal(0, 0.005, 500), rng.normal(0, 0.01, 500)
+
+
+def test_hedged_pair_gets_equal_risk(legs):
+    a, noise, c = legs
+    manager = RiskManager(returns(A=a, B=-a + noise, C=c))
+    weights = manager.risk_parity_weights()
+
+    assert weights.sum() == pytest.approx(1.0)
+    assert np.all(weights > 0.1)  # The hedge leg keeps its capital
+    np.testing.assert_allclose(risk_shares(manager, weights), 1 / 3, atol=1e-6)
+
+
+def test_correlated_pair_shares_one_slot(legs):
+    a, noise, c = legs
+    manager = RiskManager(returns(A=a, B=a + noise / 2, C=c))
+    weights = manager.risk_parity_weights()
+    np.testing.assert_allclose(risk_shares(manager, weights), 1 / 3, atol=1e-6)
+    # Inverse volatility would give C a third; ERC gives it more because A and B move together
+    assert weights[2] > 0.5
+
+
+def test_perfect_hedge_falls_back_to_inverse_vol(legs):
+    a, _, c = legs
+    manager = RiskManager(returns(A=a, B=-a, C=c))
+    weights = manager.risk_parity_weights()
+    vol = np.sqrt(np.diag(manager.cov))
+    np.testing.assert_allclose(weights, (1 / vol) / (1 / vol).sum())
+
+    summary = manager.summary(10000, n_paths=2000, seed=1)
+    assert np.isfinite(summary['positions']['Weight']).all()
+    assert np.isfinite([summary['historical']['VaR'], summary['parametric']['VaR'],
+                        summary['monte_carlo']['VaR']]).all()
+
+
+def test_zero_vol_asset_gets_no_weight(legs):
+    a, _, c = legs
+    manager = RiskManager(returns(A=a, B=np.zeros_like(a), C=c))
+    weights = manager.risk_parity_weights()
+    assert weights[1] == 0
+    assert weights.sum() == pytest.approx(1.0)
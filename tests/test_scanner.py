@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.scanner import PanelScanner
+from src.strategy import TradingStrategy
+
+
+@pytest.fixture
+def mixed_panel():
+    """Calendar-day panel mixing 24/7 symbols, weekday-only symbols, late listings and missing bars."""
+    rng = np.random.default_rng(3)
+    index = pd.date_range("2023-01-01", periods=400, freq="D")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, (len(index), 40)), axis=0))
+    panel = pd.DataFrame(close, index=index, columns=[f"SYM{i:02d}" for i in range(40)])
+    panel.iloc[index.dayofweek >= 5, 10:20] = np.nan  # Exchange calendar
+    for k, col in enumerate(panel.columns[20:30]):
+        panel.iloc[:(k + 1) * 30, 20 + k] = np.nan  # Staggered listing dates
+    for col in panel.columns[30:38]:
+        panel.loc[panel.index[rng.choice(len(index) - 1, 3, replace=False)], col] = np.nan  # Single-bar gaps
+    panel.iloc[:-20, 38] = np.nan  # Too short for any indicator
+    panel.iloc[:, 39] = np.nan  # Never traded
+    return panel
+
+
+def per_symbol(panel, strategy):
+    """The single-symbol dashboard pipeline on each column's own bars."""
+    frames = {}
+    for symbol in panel.columns:
+        close = panel[symbol].dropna()
+        if len(close):
+            df = pd.DataFrame({'Close': close})
+            frames[symbol] = strategy.generate_signals(strategy.add_indicators(df))
+    return frames
+
+
+@pytest.mark.parametrize("params", [{}, {"rsi_period": 7, "bb_period": 10, "bb_std": 1.5}])
+def test_scan_matches_per_symbol_pipeline(mixed_panel, params):
+    strategy = TradingStrategy(**params)
+    table = PanelScanner(strategy).scan(mixed_panel)
+    frames = per_symbol(mixed_panel, strategy)
+
+    assert list(table.index) == list(frames)
+    for symbol, df in frames.items():
+        row = table.loc[symbol]
+        assert row['Date'] == df.index[-1]
+        assert row['Price'] == df['Close'].iloc[-1]
+        np.testing.assert_allclose(row['RSI'], df['RSI'].iloc[-1], rtol=1e-9, equal_nan=True)
+        assert row['Signal'] == df['Signal'].iloc[-1]
+
+
+@pytest.mark.parametrize("params", [{}, {"rsi_period": 7, "bb_period": 10, "bb_std": 1.5}])
+def test_signal_panel_matches_per_symbol_pipeline(mixed_panel, params):
+    strategy = TradingStrategy(**params)
+    signals = PanelScanner(strategy).signal_panel(mixed_panel)
+    frames = per_symbol(mixed_panel, strategy)
+
+    assert signals.shape == mixed_panel.shape
+    assert (signals.to_numpy() != 0).sum() > 0
+    for symbol in mixed_panel.columns:
+        expected = frames[symbol]['Signal'] if symbol in frames else pd.Series(dtype=np.int8)
+        expected = expected.reindex(mixed_panel.index, fill_value=0).astype(np.int8)
+        np.testing.assert_array_equal(signals[symbol].to_numpy(), expected.to_numpy(), err_msg=symbol)
+
+
+def test_indicators_match_on_late_starts(mixed_panel):
+    # Leading NaNs are a per-column start offset, not a different calendar
+    strategy = TradingStrategy()
+    staggered = mixed_panel.iloc[:, 20:30]
+    ind = PanelScanner(strategy).indicators(staggered.to_numpy())
+    for j, symbol in enumerate(staggered.columns):
+        close = staggered[symbol].dropna()
+        expected = strategy.add_indicators(pd.DataFrame({'Close': close}))
+        rows = staggered.index.get_indexer(close.index)
+        for name in ('RSI', 'BB_High', 'BB_Low', 'MACD_Diff'):
+            np.testing.assert_allclose(ind[name][rows, j], expected[name].to_numpy(),
+                                       rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=f"{symbol} {name}")
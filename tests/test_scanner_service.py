@@ -0,0 +1,45 @@
+import hashlib
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from src.scanner_service import ScanStore
+
+
+def digest(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+@pytest.fixture
+def published(tmp_path):
+    path = tmp_path / "scanner.db"
+    store = ScanStore(str(path))
+    scan = pd.DataFrame({'Date': [pd.Timestamp("2024-01-02")], 'Price': [10.0], 'RSI': [30.0], 'Signal': [1]},
+                        index=['AAA'])
+    store.publish('1y', scan, {'AAA': pd.DataFrame({'Close': [10.0]})})
+    store.publish_sentiment({'AAA': 0.25})
+    # Fold the WAL into the main file so any later write would change it
+    with sqlite3.connect(path) as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return path
+
+
+def test_readonly_store_never_writes(published):
+    before = digest(published)
+    reader = ScanStore.open_readonly(str(published))
+    assert reader.last_update('1y') is not None
+    assert list(reader.read_scan(['AAA', 'BBB'], '1y').index) == ['AAA']
+    assert reader.read_frame('AAA', '1y')['Close'].tolist() == [10.0]
+    assert reader.read_sentiment('AAA') == 0.25
+    assert digest(published) == before
+
+    with pytest.raises(sqlite3.OperationalError):
+        reader.publish_sentiment({'AAA': 0.5})
+
+
+def test_readonly_store_before_the_service_started(tmp_path):
+    assert ScanStore.open_readonly(str(tmp_path / "missing.db")) is None
+    empty = tmp_path / "empty.db"
+    sqlite3.connect(empty).close()
+    assert ScanStore.open_readonly(str(empty)).last_update('1y') is None
@@ -0,0 +1,41 @@
+import json
+import threading
+
+from src.sentiment_analyzer import HeadlineCache
+
+
+def wait_for_saver():
+    for thread in threading.enumerate():
+        if thread.name == "sentiment-cache-save":
+            thread.join()
+
+
+def test_save_later_is_debounced(tmp_path, monkeypatch):
+    path = tmp_path / "sentiment.json"
+    cache = HeadlineCache(path=str(path), save_interval=3600)
+    writes = []
+    monkeypatch.setattr("src.sentiment_analyzer.os.replace", lambda src, dst: writes.append(dst))
+
+    cache.put("Stocks rally", 0.5)
+    cache.save_later()
+    wait_for_saver()
+    for i in range(100):
+        cache.put(f"Headline {i}", 0.1)
+        cache.save_later()
+    wait_for_saver()
+    assert writes == [str(path)]  # One write per interval, however many headlines arrive
+
+
+def test_pending_scores_are_flushed_by_save(tmp_path):
+    path = tmp_path / "sentiment.json"
+    cache = HeadlineCache(path=str(path), save_interval=3600)
+    cache.put("Stocks rally", 0.5)
+    cache.save_later()
+    wait_for_saver()
+    cache.put("Stocks slump", -0.5)
+    cache.save_later()  # Debounced
+    cache.save()  # What the exit hook runs
+    assert len(json.loads(path.read_text())) == 2
+
+    reloaded = HeadlineCache(path=str(path))
+    assert reloaded.get("Stocks slump") == -0.5